@@ -26,6 +26,7 @@ setup(
         "pyaudio>=0.2.11",
         "librosa>=0.8.0",
         "mediapipe>=0.8.9",
+        "numba>=0.53.0",
         "pygame>=2.0.0",
         "PyQt5>=5.15.0",
     ],
@@ -2,22 +2,35 @@
 Main application class for VideoJockey.
 """
 
-import os
 import time
 import cv2
 import numpy as np
-import threading
 import pygame
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtCore import Qt
 
 from videojockey.core import config
+from videojockey.core.config import DEBUG as _DEBUG
 from videojockey.core.video_capture import VideoCapture
 from videojockey.core.audio_processor import AudioProcessor
 from videojockey.core.effect_manager import EffectManager
-from videojockey.core.human_segmentation import HumanSegmentation
+from videojockey.core.effect_worker import EffectWorker
 from videojockey.core.message_manager import MessageManager
 
+# Qt 5.14+ can display OpenCV's BGR byte order directly
+_HAS_BGR888 = hasattr(QtGui.QImage, 'Format_BGR888')
+
+def _cuda_available():
+    """Check whether OpenCV was built with CUDA and a device is present.
+    
+    Returns:
+        bool: True if cv2.cuda can be used
+    """
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
 class VideoJockeyApp(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
@@ -30,16 +43,33 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
         self.video_capture = VideoCapture()
         self.audio_processor = AudioProcessor()
         self.effect_manager = EffectManager()
-        self.human_segmentation = HumanSegmentation()
         self.message_manager = MessageManager()
+        self.effect_worker = EffectWorker(
+            self.effect_manager,
+            self.message_manager,
+            self.audio_processor
+        )
         
         # Application state
         self.running = False
         self.current_frame = None
-        self.fps_counter = 0
-        self.fps_timer = time.time()
+        self._frame_count = 0
+        self._fps_last_time = time.perf_counter()
         self.current_fps = 0
         self.fullscreen_mode = False
+        self._native_frame_size = None
+        
+        # Display buffer, image and pixmap reused across frames
+        self._display_buf = None
+        self._display_image = None
+        self._display_pixmap = QtGui.QPixmap()
+        
+        # Upload frames once and do the display resize/convert on the GPU if possible
+        self._use_cuda = config.USE_CUDA and _cuda_available()
+        if self._use_cuda:
+            self._gpu_frame = cv2.cuda_GpuMat()
+            if _DEBUG:
+                print("Using CUDA for display conversion")
         
         # Load effects
         self.effect_manager.load_effects()
@@ -48,22 +78,21 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
         # Initialize distortion level
         self.video_capture.set_distortion_level(0)
         
-        # Load background images
-        self.background_images = []
-        for bg_path in config.BACKGROUND_IMAGES:
-            if os.path.exists(bg_path):
-                try:
-                    img = cv2.imread(bg_path)
-                    if img is not None:
-                        self.background_images.append(img)
-                except Exception as e:
-                    if config.DEBUG:
-                        print(f"Failed to load background image {bg_path}: {e}")
-        
-        # Start timer for UI updates
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.update_ui)
-        self.timer.start(30)  # ~30 FPS for UI updates
+        # Slider drags emit many values; only apply the latest one after a short delay
+        self._pending_distortion = 0
+        self._distortion_timer = QtCore.QTimer()
+        self._distortion_timer.setSingleShot(True)
+        self._distortion_timer.timeout.connect(self._apply_distortion_level)
+        
+        # Captured frames go straight to the effect worker; the GUI repaints
+        # whenever the worker publishes a processed frame
+        self.video_capture.frameReady.connect(self.effect_worker.submit_frame, Qt.DirectConnection)
+        self.effect_worker.frameProcessed.connect(self.update_ui, Qt.QueuedConnection)
+        
+        # Once-a-second timer for FPS label updates
+        self._fps_timer = QtCore.QTimer()
+        self._fps_timer.timeout.connect(self._update_fps_label)
+        self._fps_timer.start(1000)
         
     def setup_ui(self):
         """Setup the application UI."""
@@ -159,11 +188,36 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
         self.move(frame_geometry.topLeft())
         
     def update_effect_list(self):
-        """Update the effect list in the combo box."""
-        self.effect_combo.clear()
+        """Update the effect list in the combo box.
+        
+        Only the items that changed are added or removed, with signals blocked so
+        editing the list doesn't trigger effect changes.
+        """
         effect_names = self.effect_manager.get_enabled_effect_names()
-        for name in effect_names:
-            self.effect_combo.addItem(name)
+        existing = [self.effect_combo.itemText(i) for i in range(self.effect_combo.count())]
+        if existing == effect_names:
+            return
+            
+        self.effect_combo.blockSignals(True)
+        try:
+            selected = self.effect_combo.currentText() or self.effect_manager.current_effect_name
+            
+            # Remove effects that are no longer enabled
+            for i in reversed(range(self.effect_combo.count())):
+                if self.effect_combo.itemText(i) not in effect_names:
+                    self.effect_combo.removeItem(i)
+                    
+            # Insert newly enabled effects at their position
+            for i, name in enumerate(effect_names):
+                if self.effect_combo.itemText(i) != name:
+                    self.effect_combo.insertItem(i, name)
+                    
+            # Restore the selection
+            index = self.effect_combo.findText(selected)
+            if index >= 0:
+                self.effect_combo.setCurrentIndex(index)
+        finally:
+            self.effect_combo.blockSignals(False)
         
     def change_effect(self, effect_name):
         """Change to a different effect."""
@@ -175,9 +229,15 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
         
     def change_distortion_level(self, value):
         """Set the distortion level on the video capture."""
-        self.video_capture.set_distortion_level(value)
+        self._pending_distortion = value
+        if not self._distortion_timer.isActive():
+            self._distortion_timer.start(16)
         self.distortion_value_label.setText(f"{value}%")
         
+    def _apply_distortion_level(self):
+        """Apply the latest distortion slider value."""
+        self.video_capture.set_distortion_level(self._pending_distortion)
+        
     def toggle_running(self):
         """Start or stop the application."""
         if self.running:
@@ -194,15 +254,22 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
             # Start video capture
             self.video_capture.start()
             
+            # Show frames at their native size so no scaling is needed
+            self._native_frame_size = self.video_capture.get_frame_size()
+            self._update_label_size()
+            
             # Start audio processing
             self.audio_processor.start()
             
+            # Start effect processing
+            self.effect_worker.start()
+            
             # Update UI
             self.running = True
             self.start_button.setText("Stop")
             
         except Exception as e:
-            if config.DEBUG:
+            if _DEBUG:
                 print(f"Failed to start: {e}")
             QtWidgets.QMessageBox.critical(self, "Error", f"Failed to start: {str(e)}")
             self.stop()
@@ -213,6 +280,10 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
         if hasattr(self, 'video_capture'):
             self.video_capture.stop()
             
+        # Stop effect processing
+        if hasattr(self, 'effect_worker'):
+            self.effect_worker.stop()
+            
         # Stop audio processing
         if hasattr(self, 'audio_processor'):
             self.audio_processor.stop()
@@ -222,53 +293,164 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
         self.start_button.setText("Start")
         
     def update_ui(self):
-        """Update the UI with the latest frame."""
-        if not self.running:
+        """Update the UI with the latest processed frame."""
+        if not self.running or not self.is_output_visible():
             return
             
-        # Get latest frame
-        frame = self.video_capture.get_frame()
+        # Get latest processed frame from the effect worker
+        processed_frame = self.effect_worker.take_processed_frame()
         
-        if frame is not None:
-            # Get audio info
-            audio_info = self.audio_processor.get_beat_info()
+        # Nothing new has been published since the last paint
+        if processed_frame is None:
+            return
             
-            # Process frame with current effect
-            processed_frame = self.effect_manager.process_frame(frame, audio_info)
+        height, width = processed_frame.shape[:2]
+        target_width, target_height = self._fit_to_label(width, height)
+        
+        if (target_width, target_height) == (width, height) and _HAS_BGR888:
+            # Label matches the frame: wrap the worker's buffer directly, no resize pass.
+            # It stays valid until the next take_processed_frame call.
+            self._display_pixmap.convertFromImage(QtGui.QImage(
+                processed_frame.data,
+                width,
+                height,
+                processed_frame.strides[0],
+                QtGui.QImage.Format_BGR888
+            ))
+            self.video_label.setPixmap(self._display_pixmap)
+            self._frame_count += 1
+            return
             
-            # Apply message overlay
-            processed_frame = self.message_manager.render_message(processed_frame, audio_info)
+        # Resize into the persistent display buffer, preserving aspect ratio
+        display_buf = self._get_display_buffer(target_width, target_height)
+        
+        # Area averaging when shrinking avoids aliasing; bilinear when enlarging
+        if target_width < width:
+            interpolation = cv2.INTER_AREA
+        else:
+            interpolation = cv2.INTER_LINEAR
+        if self._use_cuda:
+            # Resize and convert on the GPU, downloading only the display-sized image
+            self._gpu_frame.upload(processed_frame)
+            gpu_scaled = cv2.cuda.resize(
+                self._gpu_frame,
+                (target_width, target_height),
+                interpolation=interpolation
+            )
+            if not _HAS_BGR888:
+                gpu_scaled = cv2.cuda.cvtColor(gpu_scaled, cv2.COLOR_BGR2RGB)
+            gpu_scaled.download(display_buf)
+        else:
+            cv2.resize(
+                processed_frame,
+                (target_width, target_height),
+                dst=display_buf,
+                interpolation=interpolation
+            )
             
-            # Convert to QImage for display
-            if processed_frame is not None:
-                height, width, channel = processed_frame.shape
-                bytes_per_line = 3 * width
-                q_img = QtGui.QImage(
-                    processed_frame.data, 
-                    width, 
-                    height, 
-                    bytes_per_line, 
-                    QtGui.QImage.Format_RGB888
-                ).rgbSwapped()
-                
-                # Scale to fit label while maintaining aspect ratio
-                scaled_pixmap = QtGui.QPixmap.fromImage(q_img).scaled(
-                    self.video_label.size(),
-                    QtCore.Qt.KeepAspectRatio,
-                    QtCore.Qt.SmoothTransformation
-                )
-                
-                # Update the video display
-                self.video_label.setPixmap(scaled_pixmap)
-                
-                # Update FPS counter
-                self.fps_counter += 1
-                if time.time() - self.fps_timer >= 1.0:
-                    self.current_fps = self.fps_counter
-                    self.fps_counter = 0
-                    self.fps_timer = time.time()
-                    self.fps_label.setText(f"FPS: {self.current_fps}")
-                    
+            # Older Qt needs RGB; convert in place
+            if not _HAS_BGR888:
+                cv2.cvtColor(display_buf, cv2.COLOR_BGR2RGB, dst=display_buf)
+        
+        # Update the video display
+        self._display_pixmap.convertFromImage(self._display_image)
+        self.video_label.setPixmap(self._display_pixmap)
+        
+        # Count painted frames for the FPS label
+        self._frame_count += 1
+        
+    def _fit_to_label(self, width, height):
+        """Get the largest size that fits the video label with the frame's aspect ratio.
+        
+        Args:
+            width (int): Frame width
+            height (int): Frame height
+            
+        Returns:
+            tuple: (width, height) of the display image
+        """
+        label_size = self.video_label.size()
+        scale = min(label_size.width() / width, label_size.height() / height)
+        return max(1, int(width * scale)), max(1, int(height * scale))
+        
+    def _update_label_size(self):
+        """Pin the video label to the native frame size outside fullscreen."""
+        if self.fullscreen_mode or self._native_frame_size is None:
+            self.video_label.setMinimumSize(640, 480)
+            self.video_label.setMaximumSize(QtWidgets.QWIDGETSIZE_MAX, QtWidgets.QWIDGETSIZE_MAX)
+        else:
+            self.video_label.setFixedSize(*self._native_frame_size)
+            
+    def _get_display_buffer(self, width, height):
+        """Get the display buffer for the given size, reallocating only on resize.
+        
+        The QImage wraps the buffer without copying, so both are kept on self and
+        rebuilt together. The buffer is always C-contiguous with a 3 * width stride,
+        whatever layout the effects hand back.
+        
+        Args:
+            width (int): Display width
+            height (int): Display height
+            
+        Returns:
+            numpy.ndarray: Display buffer of shape (height, width, 3)
+        """
+        if self._display_buf is None or self._display_buf.shape[:2] != (height, width):
+            self._display_buf = np.empty((height, width, 3), dtype=np.uint8)
+            self._display_image = QtGui.QImage(
+                self._display_buf.data,
+                width,
+                height,
+                3 * width,
+                QtGui.QImage.Format_BGR888 if _HAS_BGR888 else QtGui.QImage.Format_RGB888
+            )
+        return self._display_buf
+        
+    def _update_fps_label(self):
+        """Refresh the FPS label from the painted frame count."""
+        now = time.perf_counter()
+        elapsed = now - self._fps_last_time
+        if elapsed <= 0:
+            return
+            
+        # Swap the counter so painting never waits on the label update
+        frame_count, self._frame_count = self._frame_count, 0
+        self._fps_last_time = now
+        self.current_fps = int(round(frame_count / elapsed))
+        self.fps_label.setText(f"FPS: {self.current_fps}")
+        
+    def is_output_visible(self):
+        """Check whether processed frames can currently be seen.
+        
+        Returns:
+            bool: False if the window is minimized or the video label has no area
+        """
+        return (not self.isMinimized() and
+                self.video_label.isVisible() and
+                self.video_label.width() > 0 and
+                self.video_label.height() > 0)
+        
+    def _update_output_visibility(self):
+        """Pause effect processing while the output can't be seen."""
+        self.effect_worker.set_paused(not self.is_output_visible())
+        
+    def changeEvent(self, event):
+        """Handle window state changes such as minimizing."""
+        if event.type() == QtCore.QEvent.WindowStateChange:
+            self._update_output_visibility()
+        super().changeEvent(event)
+        
+    def showEvent(self, event):
+        """Handle the window being shown."""
+        super().showEvent(event)
+        self._update_output_visibility()
+        
+    def hideEvent(self, event):
+        """Handle the window being hidden."""
+        super().hideEvent(event)
+        # Child widgets still report visible while this event is delivered
+        self.effect_worker.set_paused(True)
+        
     def toggle_fullscreen(self, event):
         """Toggle fullscreen mode."""
         if self.fullscreen_mode:
@@ -280,6 +462,7 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
         """Enter fullscreen mode."""
         self.fullscreen_mode = True
         self.controls_widget.hide()
+        self._update_label_size()
         self.showFullScreen()
         
     def exit_fullscreen(self):
@@ -287,6 +470,7 @@ class VideoJockeyApp(QtWidgets.QMainWindow):
         if self.fullscreen_mode:
             self.fullscreen_mode = False
             self.controls_widget.show()
+            self._update_label_size()
             self.showNormal()
     
     def show_effects_manager(self):
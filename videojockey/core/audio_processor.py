@@ -8,9 +8,39 @@ import time
 import numpy as np
 import pyaudio
 import librosa
-from collections import deque
+from numba import njit
+
+# pyFFTW is optional; fall back to numpy.fft when it isn't installed
+try:
+    import pyfftw
+except ImportError:
+    pyfftw = None
 
 from videojockey.core import config
+from videojockey.core.config import DEBUG as _DEBUG
+
+@njit(nogil=True, fastmath=True, cache=True)
+def _normalize_chunk(samples, out):
+    """Convert int16 samples to [-1, 1) floats and return their RMS in the same pass."""
+    total = 0.0
+    for i in range(samples.shape[0]):
+        value = np.float32(samples[i]) / np.float32(32768.0)
+        out[i] = value
+        total += value * value
+    if samples.shape[0] == 0:
+        return 0.0
+    return np.sqrt(total / samples.shape[0])
+
+@njit(nogil=True, fastmath=True, cache=True)
+def _band_means(spectrum, edges, out):
+    """Average the spectrum between consecutive band edges."""
+    for band in range(out.shape[0]):
+        start = edges[band]
+        end = edges[band + 1]
+        total = 0.0
+        for i in range(start, end):
+            total += spectrum[i]
+        out[band] = total / (end - start) if end > start else np.nan
 
 class AudioProcessor:
     def __init__(self):
@@ -22,8 +52,14 @@ class AudioProcessor:
         # Beat detection parameters
         self.beat_detected = False
         self.last_beat_time = 0
-        self.beat_history = deque(maxlen=20)
-        self.energy_history = deque(maxlen=30)  # Store energy history for beat detection
+        # Timestamps of the most recent beats, kept in a fixed-size ring buffer
+        self._beat_times = np.zeros(20)
+        self._beat_head = 0
+        self._beat_count = 0
+        # Energy history for beat detection, kept in a fixed-size ring buffer
+        self._energy_buf = np.zeros(30)
+        self._energy_idx = 0
+        self._energy_count = 0
         self.beat_threshold = 1.3  # Energy threshold to detect beats
         
         # Audio analysis
@@ -31,17 +67,56 @@ class AudioProcessor:
         self.frequency_bands = np.zeros(8)  # Different frequency bands
         self.audio_buffer = np.zeros(config.AUDIO_CHUNK_SIZE)
         
+        # Normalized samples alternate between two buffers so the published one
+        # isn't overwritten while the next chunk is being processed
+        self._norm_bufs = [np.zeros(config.AUDIO_CHUNK_SIZE, dtype=np.float32) for _ in range(2)]
+        self._norm_index = 0
+        
+        # Ring buffer filled by the PortAudio callback and drained by the processing
+        # thread; each side only advances its own sample counter
+        self._ring = np.zeros(16 * config.AUDIO_CHUNK_SIZE, dtype=np.int16)
+        self._ring_write = 0
+        self._ring_read = 0
+        self._chunk = np.empty(config.AUDIO_CHUNK_SIZE, dtype=np.int16)
+        self._data_available = threading.Event()
+        
+        # Planned real FFT over reused aligned buffers when pyFFTW is available
+        fft_size = config.AUDIO_CHUNK_SIZE
+        if pyfftw is not None:
+            self._fft_in = pyfftw.empty_aligned(fft_size, dtype='float32')
+            self._fft_out = pyfftw.empty_aligned(fft_size // 2 + 1, dtype='complex64')
+            self._rfft = pyfftw.FFTW(self._fft_in, self._fft_out, flags=('FFTW_MEASURE',), threads=1)
+        else:
+            self._rfft = None
+        self._fft_mag = np.empty(fft_size // 2 + 1, dtype=np.float32)
+        
+        # Edges of the 8 frequency bands over the first quarter of the spectrum,
+        # split the same way as np.array_split
+        band_range = (fft_size // 2 + 1) // 4
+        base, extra = divmod(band_range, 8)
+        band_sizes = [base + 1] * extra + [base] * (8 - extra)
+        self._band_edges = np.concatenate(([0], np.cumsum(band_sizes))).astype(np.intp)
+        
+        # Compile the JIT kernels now rather than on the first audio chunk
+        _normalize_chunk(np.zeros(1, dtype=np.int16), np.empty(1, dtype=np.float32))
+        _band_means(self._fft_mag, self._band_edges, np.empty(8))
+        
     def start(self):
         """Start audio processing in a separate thread."""
         if self.running:
             return
             
+        self._ring_write = 0
+        self._ring_read = 0
+        self._data_available.clear()
+        
         self.stream = self.audio.open(
             format=self.audio.get_format_from_width(config.AUDIO_FORMAT // 8),
             channels=config.AUDIO_CHANNELS,
             rate=config.AUDIO_SAMPLE_RATE,
             input=True,
-            frames_per_buffer=config.AUDIO_CHUNK_SIZE
+            frames_per_buffer=config.AUDIO_CHUNK_SIZE,
+            stream_callback=self._audio_callback
         )
         
         self.running = True
@@ -60,6 +135,54 @@ class AudioProcessor:
             self.stream.close()
             self.stream = None
             
+    def _audio_callback(self, in_data, frame_count, time_info, status):
+        """Copy captured samples into the ring buffer (called on the PortAudio thread)."""
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        size = len(self._ring)
+        start = self._ring_write % size
+        end = start + len(samples)
+        if end <= size:
+            self._ring[start:end] = samples
+        else:
+            split = size - start
+            self._ring[start:] = samples[:split]
+            self._ring[:end - size] = samples[split:]
+        self._ring_write += len(samples)
+        self._data_available.set()
+        return (None, pyaudio.paContinue)
+        
+    def _read_chunk(self):
+        """Take the next chunk of samples from the ring buffer.
+        
+        Returns:
+            numpy.ndarray: Chunk of int16 samples, valid until the next call, or None
+                if no full chunk arrived within the timeout
+        """
+        chunk_size = len(self._chunk)
+        if self._ring_write - self._ring_read < chunk_size:
+            # Clear before re-checking so a callback in between isn't missed
+            self._data_available.clear()
+            if self._ring_write - self._ring_read < chunk_size:
+                self._data_available.wait(timeout=0.1)
+                if self._ring_write - self._ring_read < chunk_size:
+                    return None
+                    
+        # If processing fell too far behind, skip ahead to the newest chunk
+        size = len(self._ring)
+        if self._ring_write - self._ring_read > size - chunk_size:
+            self._ring_read = self._ring_write - chunk_size
+            
+        start = self._ring_read % size
+        end = start + chunk_size
+        if end <= size:
+            self._chunk[:] = self._ring[start:end]
+        else:
+            split = size - start
+            self._chunk[:split] = self._ring[start:]
+            self._chunk[split:] = self._ring[:end - size]
+        self._ring_read += chunk_size
+        return self._chunk
+        
     def _detect_beat(self, energy):
         """Simple beat detection using energy threshold.
         
@@ -70,17 +193,33 @@ class AudioProcessor:
             bool: True if beat detected, False otherwise
         """
         # Add current energy to history
-        self.energy_history.append(energy)
+        size = len(self._energy_buf)
+        self._energy_buf[self._energy_idx] = energy
+        self._energy_idx = (self._energy_idx + 1) % size
+        self._energy_count = min(self._energy_count + 1, size)
         
         # Need some history before detecting beats
-        if len(self.energy_history) < 10:
+        count = self._energy_count
+        if count < 10:
             return False
         
+        # Mean and std don't depend on order, so work on sums over the filled part
+        history = self._energy_buf[:count]
+        total = history.sum()
+        total_sq = np.dot(history, history)
+        
         # Calculate local average (excluding current sample)
-        local_avg = np.mean(list(self.energy_history)[:-1])
+        local_avg = (total - energy) / (count - 1)
         
-        # Calculate variance for adaptive threshold
-        local_variance = np.std(list(self.energy_history)[:-3])
+        # Calculate variance for adaptive threshold (excluding the 3 newest samples)
+        recent = 0.0
+        recent_sq = 0.0
+        for i in range(1, 4):
+            value = self._energy_buf[(self._energy_idx - i) % size]
+            recent += value
+            recent_sq += value * value
+        older_mean = (total - recent) / (count - 3)
+        local_variance = np.sqrt(max(0.0, (total_sq - recent_sq) / (count - 3) - older_mean * older_mean))
         
         # Dynamic threshold with noise guard
         current_threshold = max(self.beat_threshold, 1.0 + local_variance * 0.5)
@@ -89,7 +228,7 @@ class AudioProcessor:
         is_beat = energy > local_avg * current_threshold
         
         # Enforce minimum time between beats
-        current_time = time.time()
+        current_time = time.monotonic()
         if is_beat and current_time - self.last_beat_time > config.BEAT_MIN_INTERVAL:
             self.last_beat_time = current_time
             return True
@@ -100,35 +239,53 @@ class AudioProcessor:
         """Process audio data from the microphone."""
         while self.running:
             try:
-                # Read audio chunk
-                data = self.stream.read(config.AUDIO_CHUNK_SIZE, exception_on_overflow=False)
-                audio_data = np.frombuffer(data, dtype=np.int16)
+                # Take the next audio chunk captured by the stream callback
+                audio_data = self._read_chunk()
+                if audio_data is None:
+                    continue
                 
-                # Normalize
-                normalized_data = audio_data.astype(np.float32) / 32768.0
+                # Normalize and calculate volume (RMS) in one pass, without the GIL
+                self._norm_index ^= 1
+                normalized_data = self._norm_bufs[self._norm_index]
+                self.volume = _normalize_chunk(audio_data, normalized_data)
                 self.audio_buffer = normalized_data
                 
-                # Calculate volume (RMS)
-                self.volume = np.sqrt(np.mean(normalized_data**2))
-                
                 # Detect beats using energy level
                 self.beat_detected = self._detect_beat(self.volume)
                 
                 if self.beat_detected:
-                    self.beat_history.append(time.time())
+                    self._beat_times[self._beat_head] = self.last_beat_time
+                    self._beat_head = (self._beat_head + 1) % len(self._beat_times)
+                    self._beat_count = min(self._beat_count + 1, len(self._beat_times))
                     
                 # Basic frequency analysis using FFT
                 if len(normalized_data) > 0:
-                    fft_data = np.abs(np.fft.rfft(normalized_data))
+                    fft_data = self._fft_magnitude(normalized_data)
                     # Divide the FFT into 8 frequency bands
-                    bands = np.array_split(fft_data[:len(fft_data)//4], 8)  # Use first quarter for more bass/mid focus
-                    self.frequency_bands = np.array([np.mean(band) for band in bands])
+                    bands = np.empty(8)
+                    _band_means(fft_data, self._band_edges, bands)  # Use first quarter for more bass/mid focus
+                    self.frequency_bands = bands
                     
             except Exception as e:
-                if config.DEBUG:
+                if _DEBUG:
                     print(f"Audio processing error: {e}")
                 time.sleep(0.01)
                 
+    def _fft_magnitude(self, samples):
+        """Get the magnitude spectrum of an audio chunk.
+        
+        Args:
+            samples (numpy.ndarray): Normalized audio samples
+            
+        Returns:
+            numpy.ndarray: Magnitudes of the real FFT, valid until the next call
+        """
+        if self._rfft is not None and len(samples) == len(self._fft_in):
+            self._fft_in[:] = samples
+            self._rfft()
+            return np.abs(self._fft_out, out=self._fft_mag)
+        return np.abs(np.fft.rfft(samples))
+        
     def get_beat_info(self):
         """Get current beat information.
         
@@ -137,14 +294,17 @@ class AudioProcessor:
         """
         # Calculate BPM if we have enough beat history
         bpm = 0
-        if len(self.beat_history) > 4:
-            # Calculate average time between beats
-            beat_times = list(self.beat_history)
-            intervals = [beat_times[i+1] - beat_times[i] for i in range(len(beat_times)-1)]
-            if intervals:
-                avg_interval = sum(intervals) / len(intervals)
-                if avg_interval > 0:
-                    bpm = 60.0 / avg_interval
+        beat_count = self._beat_count
+        if beat_count > 4:
+            # Calculate average time between beats; the intervals sum to the
+            # span between the oldest and newest beat
+            size = len(self._beat_times)
+            head = self._beat_head
+            newest = self._beat_times[(head - 1) % size]
+            oldest = self._beat_times[(head - beat_count) % size]
+            avg_interval = (newest - oldest) / (beat_count - 1)
+            if avg_interval > 0:
+                bpm = 60.0 / avg_interval
         
         return {
             "beat": self.beat_detected,
@@ -0,0 +1,37 @@
+"""
+Per-thread scratch buffers so effects can reuse frame-sized arrays
+instead of allocating new ones on every frame.
+"""
+
+import threading
+
+import numpy as np
+
+_local = threading.local()
+
+def get_scratch(key, shape, dtype=np.uint8):
+    """Get a reusable array owned by the calling thread.
+
+    The contents are whatever the previous user left behind, so callers must
+    overwrite or clear it. The array is handed out again the next time the
+    same key, shape and dtype are requested on this thread, which means it
+    must not be kept across frames or passed to another thread.
+
+    Args:
+        key (str): Name of the buffer, unique to the caller (e.g. "fireworks.result")
+        shape (tuple): Array shape
+        dtype (numpy.dtype): Array data type
+
+    Returns:
+        numpy.ndarray: Scratch array of the requested shape and dtype
+    """
+    buffers = getattr(_local, 'buffers', None)
+    if buffers is None:
+        buffers = _local.buffers = {}
+
+    cache_key = (key, tuple(shape), np.dtype(dtype))
+    buffer = buffers.get(cache_key)
+    if buffer is None:
+        buffer = np.empty(shape, dtype=dtype)
+        buffers[cache_key] = buffer
+    return buffer
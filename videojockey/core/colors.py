@@ -0,0 +1,41 @@
+"""
+Color helpers shared by the effects.
+"""
+
+import cv2
+import numpy as np
+
+# BGR value of every fully saturated, full brightness OpenCV hue (0-179)
+_hsv = np.full((180, 1, 3), 255, dtype=np.uint8)
+_hsv[:, 0, 0] = np.arange(180)
+HUE_TO_BGR = cv2.cvtColor(_hsv, cv2.COLOR_HSV2BGR).reshape(180, 3)
+
+# BGR value of every fully saturated OpenCV hue at every brightness, indexed [hue, value]
+_hsv = np.full((180, 256, 3), 255, dtype=np.uint8)
+_hsv[:, :, 0] = np.arange(180)[:, None]
+_hsv[:, :, 2] = np.arange(256)[None, :]
+HUE_VALUE_TO_BGR = cv2.cvtColor(_hsv, cv2.COLOR_HSV2BGR)
+del _hsv
+
+def hue_to_bgr(hue):
+    """Get the bright, saturated BGR color for an OpenCV hue.
+
+    Args:
+        hue (int): Hue in OpenCV's 0-180 range; 180 wraps around to 0
+
+    Returns:
+        list: [b, g, r] color usable with cv2 drawing functions
+    """
+    return HUE_TO_BGR[int(hue) % 180].tolist()
+
+def hue_value_to_bgr(hue, value):
+    """Get the saturated BGR color for an OpenCV hue at a given brightness.
+
+    Args:
+        hue (int): Hue in OpenCV's 0-180 range; 180 wraps around to 0
+        value (int): Brightness (0-255)
+
+    Returns:
+        list: [b, g, r] color usable with cv2 drawing functions
+    """
+    return HUE_VALUE_TO_BGR[int(hue) % 180, int(value)].tolist()
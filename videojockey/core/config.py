@@ -11,6 +11,12 @@ VIDEO_HEIGHT = 720
 FPS = 30
 USE_RTSP = False
 RTSP_URL = "rtsp://your_rtsp_stream_url"  # Replace with your RTSP stream URL
+USE_PYAV = True  # Decode RTSP streams with PyAV when it is installed
+PYAV_HWACCEL = "videotoolbox"  # Hardware decoder for PyAV, or None for software decoding
+
+# GPU settings
+USE_CUDA = True  # Use OpenCV's CUDA module for display conversion when available
+USE_OPENCL = False  # Run the OpenCV work of supporting effects through OpenCL (cv2.UMat) when available
 
 # Audio settings
 AUDIO_SAMPLE_RATE = 44100
@@ -28,6 +34,10 @@ EFFECT_TRANSITION_TIME = 2.0  # seconds
 AUTO_SWITCH_EFFECTS = True
 AUTO_SWITCH_INTERVAL = 20  # seconds
 
+# Segmentation settings
+SEGMENTATION_WIDTH = 512  # Frames are downscaled to this size for MediaPipe;
+SEGMENTATION_HEIGHT = 288  # the mask is scaled back up to the frame size
+
 # Resource paths
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RESOURCES_DIR = os.path.join(ROOT_DIR, "resources")
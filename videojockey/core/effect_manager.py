@@ -5,22 +5,32 @@ Effect manager for loading and applying visual effects.
 import os
 import time
 import importlib
-import importlib.util
 import random
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import cv2
 
 from videojockey.core import config
+from videojockey.core.config import DEBUG as _DEBUG
+
+# Transition progress this close to either end is shown as a single effect
+_TRANSITION_EPSILON = 0.02
 
 class EffectManager:
     def __init__(self):
         self.effects = {}
+        self._process_funcs = {}  # Bound process_frame functions, looked up once at load
+        self._frame_mutators = set()  # Effects that may write to their input frame
         self.disabled_effects = set()
         self.current_effect_name = None
         self.next_effect_name = None
         self.transition_start_time = 0
         self.transition_progress = 0
-        self.last_auto_switch_time = time.time()
+        self.last_auto_switch_time = time.monotonic()
+        
+        # Runs the incoming effect alongside the outgoing one during transitions
+        self._transition_pool = ThreadPoolExecutor(max_workers=1)
+        self._blend_buf = None
         
     def load_effects(self):
         """Load all effects from the effects directory."""
@@ -28,26 +38,33 @@ class EffectManager:
         
         # Clear current effects
         self.effects = {}
+        self._process_funcs = {}
+        self._frame_mutators = set()
         
         # Find all Python files in the effects directory
-        for filename in os.listdir(effect_path):
+        for filename in sorted(os.listdir(effect_path)):
             if filename.endswith('.py') and not filename.startswith('__'):
                 effect_name = os.path.splitext(filename)[0]
-                file_path = os.path.join(effect_path, filename)
                 
                 try:
-                    # Load the module dynamically
-                    spec = importlib.util.spec_from_file_location(effect_name, file_path)
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
+                    # Import through the effects package so modules and bytecode are cached
+                    module = importlib.import_module(f"videojockey.effects.{effect_name}")
                     
                     # Check if the module has a process_frame function
                     if hasattr(module, 'process_frame'):
+                        # Let the effect build its lookup tables up front
+                        if hasattr(module, 'init_effect'):
+                            module.init_effect(config.VIDEO_WIDTH, config.VIDEO_HEIGHT)
                         self.effects[effect_name] = module
-                        if config.DEBUG:
+                        self._process_funcs[effect_name] = module.process_frame
+                        
+                        # Effects must opt out of getting their own copy of the frame
+                        if getattr(module, 'MUTATES_FRAME', True):
+                            self._frame_mutators.add(effect_name)
+                        if _DEBUG:
                             print(f"Loaded effect: {effect_name}")
                 except Exception as e:
-                    if config.DEBUG:
+                    if _DEBUG:
                         print(f"Failed to load effect {effect_name}: {e}")
         
         # Set default effect if available
@@ -87,7 +104,7 @@ class EffectManager:
                 return False
                 
             self.disabled_effects.add(effect_name)
-            if config.DEBUG:
+            if _DEBUG:
                 print(f"Disabled effect: {effect_name}")
             return True
         return False
@@ -103,7 +120,7 @@ class EffectManager:
         """
         if effect_name in self.effects and effect_name in self.disabled_effects:
             self.disabled_effects.remove(effect_name)
-            if config.DEBUG:
+            if _DEBUG:
                 print(f"Enabled effect: {effect_name}")
             return True
         return False
@@ -128,7 +145,7 @@ class EffectManager:
         if effect_name in self.effects:
             # Start transition
             self.next_effect_name = effect_name
-            self.transition_start_time = time.time()
+            self.transition_start_time = time.monotonic()
             self.transition_progress = 0
             
     def switch_to_random_effect(self):
@@ -137,16 +154,17 @@ class EffectManager:
                              if name != self.current_effect_name and name not in self.disabled_effects]
         if available_effects:
             random_effect = random.choice(available_effects)
-            if config.DEBUG:
+            if _DEBUG:
                 print(f"Switching to random effect: {random_effect}")
             self.set_effect(random_effect)
             
-    def process_frame(self, frame, audio_info):
+    def process_frame(self, frame, audio_info, now=None):
         """Process the frame with the current effect.
         
         Args:
             frame (numpy.ndarray): Video frame to process
             audio_info (dict): Audio information including beat detection
+            now (float, optional): time.monotonic() timestamp for this frame
             
         Returns:
             numpy.ndarray: Processed frame
@@ -155,10 +173,10 @@ class EffectManager:
             return frame
             
         # Check if we should auto-switch effects
-        current_time = time.time()
+        current_time = time.monotonic() if now is None else now
         if (config.AUTO_SWITCH_EFFECTS and 
             current_time - self.last_auto_switch_time > config.AUTO_SWITCH_INTERVAL):
-            if config.DEBUG:
+            if _DEBUG:
                 print(f"Auto-switching effect after {config.AUTO_SWITCH_INTERVAL} seconds")
             self.last_auto_switch_time = current_time
             self.switch_to_random_effect()
@@ -169,25 +187,38 @@ class EffectManager:
             elapsed = current_time - self.transition_start_time
             self.transition_progress = min(1.0, elapsed / config.EFFECT_TRANSITION_TIME)
             
-            # Get the processed frames from both effects
-            current_processed = self.effects[self.current_effect_name].process_frame(frame.copy(), audio_info)
-            next_processed = self.effects[self.next_effect_name].process_frame(frame.copy(), audio_info)
+            # If transition is (almost) complete, switch to the next effect
+            if self.transition_progress >= 1.0 - _TRANSITION_EPSILON:
+                self.current_effect_name = self.next_effect_name
+                self.next_effect_name = None
+                return self._process_funcs[self.current_effect_name](frame, audio_info)
+                
+            # Barely started; the next effect wouldn't be visible yet
+            if self.transition_progress <= _TRANSITION_EPSILON:
+                return self._process_funcs[self.current_effect_name](frame, audio_info)
+            
+            # Only effects that write to their input need their own copy of the frame
+            next_frame = frame.copy() if self.next_effect_name in self._frame_mutators else frame
+            current_frame = frame.copy() if self.current_effect_name in self._frame_mutators else frame
+            
+            # Get the processed frames from both effects; OpenCV releases the GIL,
+            # so running the next effect on the pool overlaps the two
+            next_future = self._transition_pool.submit(
+                self._process_funcs[self.next_effect_name], next_frame, audio_info)
+            current_processed = self._process_funcs[self.current_effect_name](current_frame, audio_info)
+            next_processed = next_future.result()
             
-            # Blend the frames based on transition progress
-            result = cv2.addWeighted(
+            # Blend the frames based on transition progress into a reused buffer
+            self._blend_buf = cv2.addWeighted(
                 current_processed, 
                 1.0 - self.transition_progress, 
                 next_processed, 
                 self.transition_progress, 
-                0
+                0,
+                dst=self._blend_buf
             )
-            
-            # If transition is complete, switch to the next effect
-            if self.transition_progress >= 1.0:
-                self.current_effect_name = self.next_effect_name
-                self.next_effect_name = None
                 
-            return result
+            return self._blend_buf
         else:
             # Apply the current effect
-            return self.effects[self.current_effect_name].process_frame(frame, audio_info)
\ No newline at end of file
+            return self._process_funcs[self.current_effect_name](frame, audio_info)
\ No newline at end of file
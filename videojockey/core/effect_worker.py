@@ -0,0 +1,139 @@
+"""
+Effect worker thread that runs the effect chain off the GUI thread.
+Frames are handed over through single-slot buffers so the worker always
+processes the newest frame and the GUI always paints the newest result.
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from PyQt5 import QtCore
+
+from videojockey.core.config import DEBUG as _DEBUG
+
+class EffectWorker(QtCore.QThread):
+    # Emitted after a processed frame has been published
+    frameProcessed = QtCore.pyqtSignal()
+
+    def __init__(self, effect_manager, message_manager, audio_processor):
+        super().__init__()
+        self.effect_manager = effect_manager
+        self.message_manager = message_manager
+        self.audio_processor = audio_processor
+        self.running = False
+        self.paused = False
+
+        # Single-slot handoff queues (newest item wins)
+        self._input = deque(maxlen=1)
+        self._output = deque(maxlen=1)
+        self._lock = threading.Lock()
+        self._frame_available = threading.Event()
+
+        # Ping-pong output buffers; the GUI holds one while the worker fills the other
+        self._buffers = [None, None]
+        self._held_index = None
+
+    def start(self):
+        """Start processing frames in the worker thread."""
+        if self.running:
+            return
+
+        self.running = True
+        super().start()
+
+    def stop(self):
+        """Stop the worker thread and drop any pending frames."""
+        self.running = False
+        self._frame_available.set()
+        self.wait(1000)
+
+        with self._lock:
+            self._input.clear()
+            self._output.clear()
+            self._held_index = None
+
+    def set_paused(self, paused):
+        """Pause or resume processing; frames submitted while paused are dropped.
+
+        Args:
+            paused (bool): True to pause, False to resume
+        """
+        self.paused = paused
+
+    def submit_frame(self, frame):
+        """Hand a captured frame to the worker, replacing any unprocessed one.
+
+        Args:
+            frame (numpy.ndarray): Captured video frame
+        """
+        if self.paused:
+            return
+
+        with self._lock:
+            self._input.append(frame)
+        self._frame_available.set()
+
+    def take_processed_frame(self):
+        """Get the most recently processed frame.
+
+        The returned buffer stays valid until the next call.
+
+        Returns:
+            numpy.ndarray: Latest processed frame or None if nothing new is available
+        """
+        with self._lock:
+            if not self._output:
+                return None
+            self._held_index = self._output.pop()
+            return self._buffers[self._held_index]
+
+    def run(self):
+        """Process frames until stopped."""
+        while self.running:
+            if not self._frame_available.wait(timeout=0.1):
+                continue
+            self._frame_available.clear()
+
+            with self._lock:
+                if not self._input:
+                    continue
+                frame = self._input.pop()
+
+            try:
+                # Read the clock once and share it across this frame's work
+                now = time.monotonic()
+
+                # Get audio info
+                audio_info = self.audio_processor.get_beat_info()
+
+                # Process frame with current effect
+                processed_frame = self.effect_manager.process_frame(frame, audio_info, now)
+
+                # Apply message overlay
+                processed_frame = self.message_manager.render_message(processed_frame, audio_info, now)
+            except Exception as e:
+                if _DEBUG:
+                    print(f"Effect processing error: {e}")
+                continue
+
+            if processed_frame is not None:
+                self._publish(processed_frame)
+                self.frameProcessed.emit()
+
+    def _publish(self, processed_frame):
+        """Copy a processed frame into the free output buffer and publish it."""
+        with self._lock:
+            # Write into the buffer the GUI is not holding and drop any unread result
+            index = 1 if self._held_index == 0 else 0
+            self._output.clear()
+
+        buffer = self._buffers[index]
+        if buffer is None or buffer.shape != processed_frame.shape:
+            buffer = np.empty(processed_frame.shape, dtype=np.uint8)
+            self._buffers[index] = buffer
+        np.copyto(buffer, processed_frame)
+
+        with self._lock:
+            self._output.append(index)
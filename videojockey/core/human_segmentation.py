@@ -2,43 +2,160 @@
 Human segmentation module using MediaPipe.
 """
 
+import threading
+from collections import OrderedDict
 import cv2
 import numpy as np
 import mediapipe as mp
 
+from videojockey.core import config
+from videojockey.core.config import DEBUG as _DEBUG
+
 class HumanSegmentation:
     def __init__(self):
         self.mp_selfie_segmentation = mp.solutions.selfie_segmentation
         self.segmentation = self.mp_selfie_segmentation.SelfieSegmentation(model_selection=1)  # 1 is the landscape model
         
+        # The model works at low resolution internally, so run it on a downscaled frame
+        self._infer_size = (config.SEGMENTATION_WIDTH, config.SEGMENTATION_HEIGHT)
+        
+        # Inference runs on a background thread; the newest frame and the latest mask
+        # are handed over through single slots so callers never wait on the model
+        self.running = False
+        self.thread = None
+        self._lock = threading.Lock()
+        self._frame_available = threading.Event()
+        self._pending_frame = None
+        self._latest_mask = None
+        
+        # RGB conversion target reused across frames by the segmentation thread
+        self._rgb_buf = None
+        
+        # Resized backgrounds keyed by (id(background), height, width), least recently used first
+        self._bg_cache = OrderedDict()
+        self._bg_cache_size = 8
+        
+    def start(self):
+        """Start segmenting frames in a separate thread."""
+        if self.running:
+            return
+            
+        self.running = True
+        self.thread = threading.Thread(target=self._process_frames)
+        self.thread.daemon = True
+        self.thread.start()
+        
+    def stop(self):
+        """Stop the segmentation thread."""
+        self.running = False
+        self._frame_available.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            
     def segment_human(self, frame):
         """Segment humans in the frame.
         
+        Same as get_mask(), but also returns the segmented image.
+        
         Args:
             frame (numpy.ndarray): Input frame
             
         Returns:
             tuple: (mask, segmented_image) where:
-                - mask is a binary mask where 1 represents human and 0 represents background
+                - mask is a boolean (height, width) mask where True represents human
                 - segmented_image is the input image with only the human part visible
         """
-        # Convert to RGB (MediaPipe requires RGB)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        mask = self.get_mask(frame)
         
-        # Process the frame
-        results = self.segmentation.process(frame_rgb)
+        # Create segmented image (copyTo zero-fills pixels outside the mask)
+        segmented_image = cv2.copyTo(frame, mask.view(np.uint8))
         
-        # Get the segmentation mask
-        mask = results.segmentation_mask
+        return mask, segmented_image
         
-        # Convert mask to binary (0 or 1)
-        mask = np.stack((mask,) * 3, axis=-1) > 0.1
+    def get_mask(self, frame):
+        """Get the human mask for the frame.
         
-        # Create segmented image
-        segmented_image = np.zeros_like(frame)
-        segmented_image[mask] = frame[mask]
+        The frame is queued for segmentation in the background and the mask from the
+        most recently finished frame is returned, so it may lag the input slightly.
+        The mask is empty until the first result is ready.
         
-        return mask, segmented_image
+        Args:
+            frame (numpy.ndarray): Input frame
+            
+        Returns:
+            numpy.ndarray: Boolean (height, width) mask where True represents human
+        """
+        if not self.running:
+            self.start()
+            
+        height, width = frame.shape[:2]
+        
+        # Downscale for inference if the frame is larger than the model input;
+        # either way the worker gets its own copy of the pixels
+        if width > self._infer_size[0] and height > self._infer_size[1]:
+            small_frame = cv2.resize(frame, self._infer_size, interpolation=cv2.INTER_AREA)
+        else:
+            small_frame = frame.copy()
+            
+        # Hand the frame to the worker, replacing any frame it hasn't started on
+        with self._lock:
+            self._pending_frame = (small_frame, (width, height))
+            mask = self._latest_mask
+        self._frame_available.set()
+        
+        if mask is None or mask.shape != (height, width):
+            mask = np.zeros((height, width), dtype=bool)
+        
+        return mask
+        
+    def _process_frames(self):
+        """Segment queued frames until stopped."""
+        while self.running:
+            if not self._frame_available.wait(timeout=0.1):
+                continue
+            self._frame_available.clear()
+            
+            with self._lock:
+                pending = self._pending_frame
+                self._pending_frame = None
+            if pending is None:
+                continue
+                
+            try:
+                mask = self._compute_mask(*pending)
+            except Exception as e:
+                if _DEBUG:
+                    print(f"Segmentation error: {e}")
+                continue
+                
+            with self._lock:
+                self._latest_mask = mask
+                
+    def _compute_mask(self, small_frame, frame_size):
+        """Run the segmentation model on a frame.
+        
+        Args:
+            small_frame (numpy.ndarray): Frame at inference resolution
+            frame_size (tuple): (width, height) of the original frame
+            
+        Returns:
+            numpy.ndarray: Boolean mask at the original frame size
+        """
+        # Convert to RGB (MediaPipe requires RGB) into the persistent buffer
+        if self._rgb_buf is None or self._rgb_buf.shape != small_frame.shape:
+            self._rgb_buf = np.empty_like(small_frame)
+        cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        
+        # Process the frame
+        results = self.segmentation.process(self._rgb_buf)
+        
+        # Get the segmentation mask at frame size
+        mask = results.segmentation_mask
+        if mask.shape[:2] != (frame_size[1], frame_size[0]):
+            mask = cv2.resize(mask, frame_size, interpolation=cv2.INTER_LINEAR)
+        
+        # Convert mask to binary, keeping a single channel
+        return mask > 0.1
         
     def replace_background(self, frame, background, mask=None):
         """Replace the background of the frame.
@@ -56,20 +173,43 @@ class HumanSegmentation:
         
         # Ensure the background is the same size as the frame
         if isinstance(background, np.ndarray) and background.shape[:2] != frame.shape[:2]:
-            background = cv2.resize(background, (frame.shape[1], frame.shape[0]))
+            background = self._get_resized_background(background, frame.shape[1], frame.shape[0])
             
-        # Create result image
-        result = np.zeros_like(frame)
-        
-        # Set background
+        # Create result image with the background
         if isinstance(background, np.ndarray):
             # Use image as background
-            result[~mask] = background[~mask]
+            result = background.copy()
         else:
             # Use color as background
-            result[~mask] = background
+            result = np.empty_like(frame)
+            result[:] = background
             
         # Set foreground (human)
-        result[mask] = frame[mask]
+        cv2.copyTo(frame, mask.view(np.uint8), result)
         
-        return result
\ No newline at end of file
+        return result
+        
+    def _get_resized_background(self, background, width, height):
+        """Get a background resized to the frame size, resizing only on a cache miss.
+        
+        Args:
+            background (numpy.ndarray): Background image
+            width (int): Frame width
+            height (int): Frame height
+            
+        Returns:
+            numpy.ndarray: Resized background
+        """
+        key = (id(background), height, width)
+        cached = self._bg_cache.get(key)
+        
+        # The source is stored with the result so its id can't be reused while cached
+        if cached is not None and cached[0] is background:
+            self._bg_cache.move_to_end(key)
+            return cached[1]
+            
+        resized = cv2.resize(background, (width, height))
+        self._bg_cache[key] = (background, resized)
+        if len(self._bg_cache) > self._bg_cache_size:
+            self._bg_cache.popitem(last=False)
+        return resized
\ No newline at end of file
@@ -9,6 +9,14 @@ import cv2
 import numpy as np
 
 from videojockey.core import config
+from videojockey.core.config import DEBUG as _DEBUG
+
+# Number of entries in the per-message animation tables
+_ANIMATION_TABLE_SIZE = 256
+
+def _glow_color_for(color):
+    """Pick a glow color that contrasts with the text color."""
+    return (0, 0, 0) if sum(color) > 380 else (255, 255, 255)
 
 class MessageManager:
     def __init__(self):
@@ -23,6 +31,20 @@ class MessageManager:
         self.animation_type = "static"  # static, scroll, pulse, wave
         self.glow_enabled = False
         
+        # Text metrics and position cached per message
+        self._text_size = None
+        self._resolved_position = None
+        self._position_frame_size = None
+        self._pulse_scale = None
+        self._pulse_text_size = None
+        
+        # Colors and animation curves precomputed per message
+        self._brightened_color = self.font_color
+        self._glow_color = _glow_color_for(self.font_color)
+        self._brightened_glow_color = self._glow_color
+        self._wave_table = None
+        self._pulse_table = None
+        
         # Load messages from file
         self.load_messages()
     
@@ -32,10 +54,10 @@ class MessageManager:
             try:
                 with open(config.MESSAGES_FILE, 'r', encoding='utf-8') as f:
                     self.messages = [line.strip() for line in f if line.strip()]
-                if config.DEBUG:
+                if _DEBUG:
                     print(f"Loaded {len(self.messages)} messages")
             except Exception as e:
-                if config.DEBUG:
+                if _DEBUG:
                     print(f"Failed to load messages: {e}")
         else:
             # Create default messages file
@@ -55,16 +77,20 @@ class MessageManager:
                 with open(config.MESSAGES_FILE, 'w', encoding='utf-8') as f:
                     f.write('\n'.join(default_messages))
                 self.messages = default_messages
-                if config.DEBUG:
+                if _DEBUG:
                     print(f"Created default messages file with {len(self.messages)} messages")
             except Exception as e:
-                if config.DEBUG:
+                if _DEBUG:
                     print(f"Failed to create default messages file: {e}")
                 self.messages = default_messages
     
-    def select_random_message(self):
-        """Select a random message and formatting."""
-        current_time = time.time()
+    def select_random_message(self, now=None):
+        """Select a random message and formatting.
+        
+        Args:
+            now (float, optional): time.monotonic() timestamp, read if not given
+        """
+        current_time = time.monotonic() if now is None else now
         
         # Check if it's time to display a new message
         if self.current_message is None or current_time - self.last_message_time > config.MESSAGE_DISPLAY_INTERVAL:
@@ -78,6 +104,10 @@ class MessageManager:
                 self.font = random.choice(config.MESSAGE_FONTS)
                 self.font_size = random.uniform(1.0, 3.0)
                 
+                # Measure the text once per message
+                self._text_size = cv2.getTextSize(self.current_message, self.font, self.font_size, 2)
+                self._pulse_scale = None
+                
                 # Select random color (bright and vibrant)
                 hue = random.randint(0, 179)
                 sat = random.randint(200, 255)
@@ -85,6 +115,16 @@ class MessageManager:
                 color_hsv = np.uint8([[[hue, sat, val]]])
                 self.font_color = cv2.cvtColor(color_hsv, cv2.COLOR_HSV2BGR)[0][0].tolist()
                 
+                # Beat-brightened color and contrasting glow colors
+                self._brightened_color = [min(255, c + 50) for c in self.font_color]
+                self._glow_color = _glow_color_for(self.font_color)
+                self._brightened_glow_color = _glow_color_for(self._brightened_color)
+                
+                # Tabulate the wave and pulse curves over the message duration
+                times = np.linspace(0, config.MESSAGE_DURATION, _ANIMATION_TABLE_SIZE)
+                self._wave_table = np.sin(times * 4).tolist()
+                self._pulse_table = np.sin(times * 5).tolist()
+                
                 # Select random position
                 def get_random_position(frame_width, frame_height, text_width, text_height):
                     pos_options = [
@@ -106,6 +146,7 @@ class MessageManager:
                 
                 # We'll set actual position when rendering since we need to know the frame dimensions
                 self.position = get_random_position
+                self._position_frame_size = None
                 
                 # Select random animation
                 self.animation_type = random.choice(["static", "scroll", "pulse", "wave"])
@@ -113,52 +154,69 @@ class MessageManager:
                 # Random glow effect
                 self.glow_enabled = random.random() > 0.5
     
-    def get_message_duration(self):
-        """Get the duration of the current message display."""
+    def get_message_duration(self, now=None):
+        """Get the duration of the current message display.
+        
+        Args:
+            now (float, optional): time.monotonic() timestamp, read if not given
+        """
         if self.current_message is None:
             return 0
-        return time.time() - self.current_message_start
+        if now is None:
+            now = time.monotonic()
+        return now - self.current_message_start
     
-    def render_message(self, frame, audio_info):
+    def render_message(self, frame, audio_info, now=None):
         """Render the current message on the frame.
         
+        The message is drawn onto the frame in place.
+        
         Args:
             frame (numpy.ndarray): Video frame to render on
             audio_info (dict): Audio information including beat detection
+            now (float, optional): time.monotonic() timestamp for this frame
             
         Returns:
             numpy.ndarray: Frame with message rendered
         """
+        if now is None:
+            now = time.monotonic()
+            
         # Check if there's a message to display
         if self.current_message is None:
-            self.select_random_message()
+            self.select_random_message(now)
             return frame
         
         # Check if message duration has expired
-        if self.get_message_duration() > config.MESSAGE_DURATION:
+        if self.get_message_duration(now) > config.MESSAGE_DURATION:
             self.current_message = None
             return frame
         
-        # Create a copy of the frame to draw on
-        result = frame.copy()
+        # Draw directly on the frame; callers pass a per-frame buffer
+        result = frame
         height, width = result.shape[:2]
         
-        # Calculate text size
-        (text_width, text_height), baseline = cv2.getTextSize(
-            self.current_message, self.font, self.font_size, 2)
+        # Get text size measured when the message was selected
+        (text_width, text_height), baseline = self._text_size
         
-        # Get text position
+        # Get text position, resolved once per message and frame size
         if callable(self.position):
-            try: 
-                pos_x, pos_y = self.position(width, height, text_width, text_height)
-            except:
-                pos_x, pos_y = 0,0
+            if self._position_frame_size != (width, height):
+                try: 
+                    self._resolved_position = self.position(width, height, text_width, text_height)
+                except:
+                    self._resolved_position = (0, 0)
+                self._position_frame_size = (width, height)
+            pos_x, pos_y = self._resolved_position
         else:
             pos_x, pos_y = self.position
         
         # Apply animations
-        current_time = time.time()
-        time_in_animation = current_time - self.current_message_start
+        time_in_animation = now - self.current_message_start
+        
+        # Index into the per-message animation tables
+        table_index = min(_ANIMATION_TABLE_SIZE - 1, int(
+            time_in_animation / config.MESSAGE_DURATION * (_ANIMATION_TABLE_SIZE - 1)))
         
         # Modify position based on animation type
         if self.animation_type == "scroll":
@@ -170,14 +228,14 @@ class MessageManager:
             if audio_info["beat"]:
                 scale = 1.2 + audio_info["volume"] * 0.5
             else:
-                scale = 1.0 + 0.1 * np.sin(time_in_animation * 5)
+                scale = 1.0 + 0.1 * self._pulse_table[table_index]
                 
-            # Adjust font size
-            current_font_size = self.font_size * scale
-            
-            # Recalculate text size
-            (text_width, text_height), baseline = cv2.getTextSize(
-                self.current_message, self.font, current_font_size, 2)
+            # Recalculate text size only when the scale has changed noticeably
+            if self._pulse_scale is None or abs(scale - self._pulse_scale) > 0.05 * self._pulse_scale:
+                self._pulse_scale = scale
+                self._pulse_text_size = cv2.getTextSize(
+                    self.current_message, self.font, self.font_size * scale, 2)
+            (text_width, text_height), baseline = self._pulse_text_size
                 
             # Recenter text
             pos_x = (width - text_width) // 2
@@ -185,19 +243,20 @@ class MessageManager:
         elif self.animation_type == "wave":
             # Wave up and down
             wave_height = 20 + audio_info["volume"] * 30
-            pos_y += int(np.sin(time_in_animation * 4) * wave_height)
+            pos_y += int(self._wave_table[table_index] * wave_height)
         
         # Get current color, possibly modified by audio
         current_color = self.font_color
+        glow_color = self._glow_color
         if audio_info["beat"]:
             # Brighten color on beat
-            current_color = [min(255, c + 50) for c in self.font_color]
+            current_color = self._brightened_color
+            glow_color = self._brightened_glow_color
         
         # Add glow effect if enabled
         if self.glow_enabled:
             # Create a slightly larger, blurred text for the glow
             glow_size = self.font_size * 1.05
-            glow_color = (0, 0, 0) if sum(current_color) > 380 else (255, 255, 255)  # Contrast with text color
             
             # Draw glow
             cv2.putText(result, self.current_message, (pos_x, pos_y), 
@@ -0,0 +1,28 @@
+"""
+OpenCL (OpenCV T-API) support for effects.
+Effects that pass cv2.UMat arrays through their OpenCV calls get those
+calls run as OpenCL kernels; everything else stays on numpy arrays.
+"""
+
+import cv2
+
+from videojockey.core import config
+
+_enabled = None
+
+def opencl_enabled():
+    """Check whether effects should route their OpenCV work through cv2.UMat.
+
+    Returns:
+        bool: True if OpenCL is enabled in the config and available to OpenCV
+    """
+    global _enabled
+
+    if _enabled is None:
+        try:
+            _enabled = config.USE_OPENCL and cv2.ocl.haveOpenCL()
+            if _enabled:
+                cv2.ocl.setUseOpenCL(True)
+        except (AttributeError, cv2.error):
+            _enabled = False
+    return _enabled
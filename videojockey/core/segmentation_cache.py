@@ -0,0 +1,52 @@
+"""
+Shared human segmentation for effects.
+All effects use one HumanSegmentation instance, and the mask of the most
+recent frame is remembered so effects given the same frame (e.g. both
+sides of an effect transition) don't segment it twice.
+"""
+
+import threading
+
+from videojockey.core.human_segmentation import HumanSegmentation
+
+_lock = threading.Lock()
+_segmentation = None
+_last_frame = None
+_last_mask = None
+
+def get_segmentation():
+    """Get the shared HumanSegmentation instance, creating it on first use.
+
+    Returns:
+        HumanSegmentation: Segmentation shared by all effects
+    """
+    global _segmentation
+
+    with _lock:
+        if _segmentation is None:
+            _segmentation = HumanSegmentation()
+        return _segmentation
+
+def get_mask(frame):
+    """Get the human mask for a frame, reusing the result if the frame was already segmented.
+
+    Frames are matched by identity, so callers must pass the frame object they
+    were given rather than a copy.
+
+    Args:
+        frame (numpy.ndarray): Input frame
+
+    Returns:
+        numpy.ndarray: Boolean (height, width) mask where True represents human
+    """
+    global _last_frame, _last_mask
+
+    segmentation = get_segmentation()
+    with _lock:
+        if frame is _last_frame:
+            return _last_mask
+
+        mask = segmentation.get_mask(frame)
+        _last_frame = frame
+        _last_mask = mask
+        return mask
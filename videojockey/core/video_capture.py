@@ -1,26 +1,41 @@
 """
 Video capture module for ingesting video streams from camera or RTSP.
-Uses OpenCV with macOS VideoToolbox acceleration when available.
+Uses OpenCV, or PyAV with hardware decoding for RTSP streams when available.
 Includes distortion processor for applying effects to the raw video stream.
 """
 
 import cv2
 import threading
 import time
+from collections import deque
+
 import numpy as np
+from PyQt5 import QtCore
+
+# PyAV is optional; RTSP streams fall back to OpenCV's decoder without it
+try:
+    import av
+except ImportError:
+    av = None
 
 from videojockey.core import config
+from videojockey.core.config import DEBUG as _DEBUG
 from videojockey.core.video_distortion import VideoDistortion
 
-class VideoCapture:
+class VideoCapture(QtCore.QObject):
+    # Emitted from the capture thread as soon as a new frame is decoded
+    frameReady = QtCore.pyqtSignal(np.ndarray)
+    
     def __init__(self):
+        super().__init__()
         self.cap = None
+        self.container = None
+        self._av_stream = None
         self.running = False
         self.thread = None
-        self.frame = None
-        self.lock = threading.Lock()
-        self.fps = config.FPS
-        self.last_frame_time = 0
+        
+        # Single-slot handoff for the latest raw frame (newest frame wins)
+        self._frame_slot = deque(maxlen=1)
         self.distortion_processor = VideoDistortion()
         
     def start(self):
@@ -28,6 +43,22 @@ class VideoCapture:
         if self.running:
             return
             
+        # Prefer PyAV for RTSP so decoding can use the hardware decoder
+        if config.USE_RTSP and config.USE_PYAV and av is not None:
+            try:
+                self._open_av()
+            except Exception as e:
+                if _DEBUG:
+                    print(f"PyAV failed to open stream, falling back to OpenCV: {e}")
+                self.container = None
+                
+        if self.container is not None:
+            self.running = True
+            self.thread = threading.Thread(target=self._capture_frames_av)
+            self.thread.daemon = True
+            self.thread.start()
+            return
+            
         # Try to use macOS VideoToolbox acceleration if available
         if config.USE_RTSP:
             # For RTSP, use hardware acceleration
@@ -44,6 +75,9 @@ class VideoCapture:
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.VIDEO_HEIGHT)
         self.cap.set(cv2.CAP_PROP_FPS, config.FPS)
         
+        # Keep the driver-side queue at a single frame so we never read stale frames
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
         # Check if opened successfully
         if not self.cap.isOpened():
             raise ValueError("Failed to open video source")
@@ -64,35 +98,69 @@ class VideoCapture:
             self.cap.release()
             self.cap = None
             
+        if self.container:
+            self.container.close()
+            self.container = None
+            self._av_stream = None
+            
+    def _open_av(self):
+        """Open the RTSP stream with PyAV, using the configured hardware decoder if possible."""
+        options = {'rtsp_transport': 'tcp', 'fflags': 'nobuffer', 'flags': 'low_delay'}
+        
+        container = None
+        if config.PYAV_HWACCEL:
+            try:
+                from av.codec.hwaccel import HWAccel
+                hwaccel = HWAccel(device_type=config.PYAV_HWACCEL, allow_software_fallback=True)
+                container = av.open(config.RTSP_URL, options=options, timeout=5.0, hwaccel=hwaccel)
+            except Exception as e:
+                # Older PyAV or no such device; decode in software instead
+                if _DEBUG:
+                    print(f"PyAV hardware decoding unavailable: {e}")
+                    
+        if container is None:
+            container = av.open(config.RTSP_URL, options=options, timeout=5.0)
+            
+        self._av_stream = container.streams.video[0]
+        self._av_stream.thread_type = 'AUTO'
+        self.container = container
+        
+    def _capture_frames_av(self):
+        """Decode frames from the PyAV container until stopped or the stream ends."""
+        try:
+            for av_frame in self.container.decode(self._av_stream):
+                if not self.running:
+                    break
+                self._deliver_frame(av_frame.to_ndarray(format='bgr24'))
+        except Exception as e:
+            if _DEBUG and self.running:
+                print(f"Video capture error: {e}")
+                
+    def _deliver_frame(self, frame):
+        """Store a captured frame and pass it on to listeners."""
+        # Replace the previous frame without blocking readers
+        self._frame_slot.append(frame)
+        
+        # Notify listeners with the distorted frame
+        self.frameReady.emit(self.distortion_processor.process_frame(frame))
+            
     def _capture_frames(self):
         """Capture frames in a loop."""
         while self.running:
             try:
-                # Maintain a consistent frame rate
-                current_time = time.time()
-                elapsed = current_time - self.last_frame_time
+                # read() blocks until the source delivers a frame, so it paces the loop
+                ret, frame = self.cap.read()
                 
-                # Only capture a new frame if enough time has passed
-                if elapsed >= 1.0 / self.fps:
-                    ret, frame = self.cap.read()
-                    
-                    if ret:
-                        # Store the frame thread-safely
-                        with self.lock:
-                            self.frame = frame
-                            
-                        self.last_frame_time = current_time
-                    else:
-                        # Failed to read frame
-                        if config.DEBUG:
-                            print("Failed to read frame")
-                        time.sleep(0.01)
+                if ret:
+                    self._deliver_frame(frame)
                 else:
-                    # Not time for a new frame yet
-                    time.sleep(max(0, (1.0 / self.fps) - elapsed))
+                    # Failed to read frame
+                    if _DEBUG:
+                        print("Failed to read frame")
+                    time.sleep(0.01)
                     
             except Exception as e:
-                if config.DEBUG:
+                if _DEBUG:
                     print(f"Video capture error: {e}")
                 time.sleep(0.01)
                 
@@ -102,15 +170,35 @@ class VideoCapture:
         Returns:
             numpy.ndarray: Latest video frame or None if not available
         """
-        with self.lock:
-            if self.frame is not None:
-                # Get a copy to avoid thread issues
-                frame_copy = self.frame.copy()
-                
-                # Apply distortion if level > 0
-                return self.distortion_processor.process_frame(frame_copy)
+        try:
+            frame = self._frame_slot[-1]
+        except IndexError:
             return None
             
+        # Get a copy so callers can't modify the frame listeners already received
+        frame_copy = frame.copy()
+        
+        # Apply distortion if level > 0
+        return self.distortion_processor.process_frame(frame_copy)
+            
+    def get_frame_size(self):
+        """Get the native size of the captured frames.
+        
+        Returns:
+            tuple: (width, height) reported by the source, or the configured size
+        """
+        if self._av_stream is not None:
+            width = self._av_stream.codec_context.width
+            height = self._av_stream.codec_context.height
+            if width > 0 and height > 0:
+                return width, height
+        if self.cap is not None:
+            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if width > 0 and height > 0:
+                return width, height
+        return config.VIDEO_WIDTH, config.VIDEO_HEIGHT
+        
     def set_distortion_level(self, level):
         """Set the distortion level (0-100).
         
@@ -6,6 +6,33 @@ import cv2
 import numpy as np
 import random
 import time
+from numba import njit, prange
+
+from videojockey.core.buffers import get_scratch
+
+# Standard deviation of the sum of four uniform bytes, used to scale it to the requested spread
+_BYTE_SUM_STDDEV = 147.8
+
+@njit(parallel=True, nogil=True, fastmath=True, cache=True)
+def _noise_blend_kernel(frame, weight, mean, stddev, seed, out):
+    """Blend approximately Gaussian noise into the frame in one pass.
+
+    Each row runs its own xorshift32 generator; summing the four bytes of a
+    draw gives a bell-shaped value, so no noise image is ever materialized.
+    """
+    height, width, channels = frame.shape
+    keep = 1.0 - weight
+    scale = stddev / _BYTE_SUM_STDDEV
+    for y in prange(height):
+        state = ((seed + y * 2654435761) & 0xFFFFFFFF) | 1
+        for x in range(width):
+            for c in range(channels):
+                state ^= (state << 13) & 0xFFFFFFFF
+                state ^= state >> 17
+                state ^= (state << 5) & 0xFFFFFFFF
+                total = (state & 0xFF) + ((state >> 8) & 0xFF) + ((state >> 16) & 0xFF) + (state >> 24)
+                noise = min(255.0, max(0.0, mean + (total - 510.0) * scale))
+                out[y, x, c] = np.uint8(min(255.0, frame[y, x, c] * keep + noise * weight + 0.5))
 
 class VideoDistortion:
     def __init__(self):
@@ -19,10 +46,23 @@ class VideoDistortion:
             self._apply_noise,
             self._apply_glitch
         ]
+        
+        # Per-value lookup tables for the current distortion level
+        self._luts = {}
+        
+        # 1-D Gaussian kernels keyed by kernel size
+        self._blur_kernels = {}
+        
+        # Compile the noise kernel now so the first noisy frame doesn't stall
+        dummy = np.zeros((2, 2, 3), dtype=np.uint8)
+        _noise_blend_kernel(dummy, 0.5, 128.0, 30.0, 1, np.empty_like(dummy))
     
     def set_distortion_level(self, level):
         """Set the distortion level (0-100)."""
-        self.distortion_level = max(0, min(100, level))
+        level = max(0, min(100, level))
+        if level != self.distortion_level:
+            self._luts.clear()
+        self.distortion_level = level
     
     def get_distortion_level(self):
         """Get the current distortion level."""
@@ -43,6 +83,23 @@ class VideoDistortion:
         distortion_func = self.distortion_types[self.current_distortion_type]
         return distortion_func(frame)
     
+    def _get_lut(self, name, build):
+        """Get a cached 256-entry lookup table, building it on first use at this level.
+        
+        Args:
+            name (str): Cache key for the table
+            build (callable): Maps an array of the values 0-255 to the output values
+            
+        Returns:
+            numpy.ndarray: uint8 lookup table for cv2.LUT
+        """
+        lut = self._luts.get(name)
+        if lut is None:
+            values = np.arange(256, dtype=np.float64)
+            lut = np.clip(np.floor(build(values) + 0.5), 0, 255).astype(np.uint8)
+            self._luts[name] = lut
+        return lut
+    
     def _apply_posterize(self, frame):
         """Apply posterization effect (reduce color depth)."""
         intensity = self.distortion_level / 100.0
@@ -50,25 +107,37 @@ class VideoDistortion:
         # Calculate number of color levels (fewer = more posterization)
         levels = max(2, int(256 * (1 - intensity * 0.95)))
         
-        # Quantize colors
-        frame_float = frame.astype(np.float32) / 255.0
-        frame_posterized = np.floor(frame_float * levels) / levels
-        result = (frame_posterized * 255).astype(np.uint8)
+        # Quantize colors and blend with original based on intensity, as one table lookup
+        def build(values):
+            posterized = np.floor(np.floor(values * levels / 255.0) * 255.0 / levels)
+            return values * (1 - intensity) + posterized * intensity
         
-        # Blend with original based on intensity
-        return cv2.addWeighted(frame, 1 - intensity, result, intensity, 0)
+        return cv2.LUT(frame, self._get_lut('posterize', build))
     
     def _apply_wash_out(self, frame):
         """Apply wash-out effect (reduce contrast and shift colors)."""
         intensity = self.distortion_level / 100.0
         
         # Reduce contrast and add brightness
-        washed = cv2.convertScaleAbs(frame, alpha=1-intensity*0.7, beta=intensity*50)
-        
-        # Add slight blur for a dreamy effect
-        if intensity > 0.5:
-            blur_amount = int(intensity * 10) * 2 + 1
-            washed = cv2.GaussianBlur(washed, (blur_amount, blur_amount), 0)
+        def wash(values):
+            return np.clip(np.floor(values * (1 - intensity * 0.7) + intensity * 50 + 0.5), 0, 255)
+        
+        # Without the blur the whole effect is per-pixel, so fold the blend into the table too
+        if intensity <= 0.5:
+            return cv2.LUT(frame, self._get_lut(
+                'wash_out', lambda values: values * (1 - intensity) + wash(values) * intensity))
+        
+        washed = cv2.LUT(frame, self._get_lut('wash', wash),
+                         dst=get_scratch('video_distortion.washed', frame.shape, frame.dtype))
+        
+        # Add slight blur for a dreamy effect, as a separable filter with a cached kernel
+        blur_amount = int(intensity * 10) * 2 + 1
+        kernel = self._blur_kernels.get(blur_amount)
+        if kernel is None:
+            kernel = cv2.getGaussianKernel(blur_amount, 0)
+            self._blur_kernels[blur_amount] = kernel
+        blurred = get_scratch('video_distortion.blurred', frame.shape, frame.dtype)
+        washed = cv2.sepFilter2D(washed, -1, kernel, kernel, dst=blurred)
         
         return cv2.addWeighted(frame, 1 - intensity, washed, intensity, 0)
     
@@ -88,10 +157,11 @@ class VideoDistortion:
             channels = [b, g, r]
             shift_channel = random.randint(0, 2)
             
-            M = np.float32([[1, 0, shift_x], [0, 1, shift_y]])
-            channels[shift_channel] = cv2.warpAffine(channels[shift_channel], 
-                                                    M, 
-                                                    (frame.shape[1], frame.shape[0]))
+            # Pure integer translation with a black border, so a slice copy does it
+            height, width = frame.shape[:2]
+            shifted = np.zeros_like(channels[shift_channel])
+            shifted[shift_y:, shift_x:] = channels[shift_channel][:height - shift_y, :width - shift_x]
+            channels[shift_channel] = shifted
             
             result = cv2.merge(channels)
             return cv2.addWeighted(frame, 1 - intensity, result, intensity, 0)
@@ -102,41 +172,39 @@ class VideoDistortion:
         """Apply random noise to the frame."""
         intensity = self.distortion_level / 100.0
         
-        # Create noise
-        noise = np.zeros_like(frame, dtype=np.uint8)
-        cv2.randn(noise, 128, 30)  # mean=128, stddev=30
-        
-        # Blend with original based on intensity
-        return cv2.addWeighted(frame, 1 - intensity*0.7, noise, intensity*0.7, 0)
+        # Generate noise (mean=128, stddev=30) and blend with original based on intensity
+        result = np.empty_like(frame)
+        _noise_blend_kernel(np.ascontiguousarray(frame), intensity * 0.7, 128.0, 30.0,
+                            random.getrandbits(31), result)
+        return result
         
     def _apply_glitch(self, frame):
         """Apply digital glitch effect with block displacement."""
         intensity = self.distortion_level / 100.0
         
-        # Create copy for result
-        result = frame.copy()
+        # Copy into a reused buffer; the blend below returns a fresh frame
+        result = get_scratch('video_distortion.glitch', frame.shape, frame.dtype)
+        np.copyto(result, frame)
         
         # Number of glitch blocks based on intensity
         num_glitches = int(intensity * 15)
         
         height, width = frame.shape[:2]
         
-        for _ in range(num_glitches):
-            # Random block size and position
-            block_height = random.randint(5, max(5, int(height * 0.1)))
-            block_width = random.randint(10, max(10, int(width * 0.3)))
-            
-            y = random.randint(0, height - block_height - 1)
-            x = random.randint(0, width - block_width - 1)
-            
-            # Copy block to a new position or duplicate it
-            y_offset = random.randint(-30, 30)
-            x_offset = random.randint(-30, 30)
-            
-            y_dest = max(0, min(height - block_height - 1, y + y_offset))
-            x_dest = max(0, min(width - block_width - 1, x + x_offset))
-            
-            block = frame[y:y+block_height, x:x+block_width].copy()
-            result[y_dest:y_dest+block_height, x_dest:x_dest+block_width] = block
+        # Draw all random block sizes, positions and offsets up front
+        block_heights = np.random.randint(5, max(5, int(height * 0.1)) + 1, num_glitches)
+        block_widths = np.random.randint(10, max(10, int(width * 0.3)) + 1, num_glitches)
+        ys = np.random.randint(0, height - block_heights)
+        xs = np.random.randint(0, width - block_widths)
+        
+        # Copy each block to a new position
+        y_dests = np.clip(ys + np.random.randint(-30, 31, num_glitches), 0, height - block_heights - 1)
+        x_dests = np.clip(xs + np.random.randint(-30, 31, num_glitches), 0, width - block_widths - 1)
+        
+        for y, x, y_dest, x_dest, block_height, block_width in zip(
+                ys.tolist(), xs.tolist(), y_dests.tolist(), x_dests.tolist(),
+                block_heights.tolist(), block_widths.tolist()):
+            # Read from the untouched source so blocks never pick up earlier pastes
+            result[y_dest:y_dest+block_height, x_dest:x_dest+block_width] = frame[y:y+block_height, x:x+block_width]
         
         return cv2.addWeighted(frame, 1 - intensity, result, intensity, 0)
\ No newline at end of file
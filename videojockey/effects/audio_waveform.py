@@ -6,6 +6,12 @@ import cv2
 import numpy as np
 import time
 
+from videojockey.core.buffers import get_scratch
+from videojockey.core.colors import hue_to_bgr
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
+
 # Effect parameters
 waveform_height = 0.3  # Height of waveform as percentage of screen height
 waveform_color = [0, 255, 0]  # Green by default
@@ -32,7 +38,7 @@ def process_frame(frame, audio_info):
         if current_time - last_color_change > color_change_interval:
             # Generate new color
             hue = np.random.randint(0, 180)  # Hue in HSV
-            waveform_color = cv2.cvtColor(np.uint8([[[hue, 255, 255]]]), cv2.COLOR_HSV2BGR)[0][0].tolist()
+            waveform_color = hue_to_bgr(hue)
             last_color_change = current_time
             
             # Also change position occasionally
@@ -42,8 +48,9 @@ def process_frame(frame, audio_info):
     # Get raw audio data
     audio_data = audio_info["raw_audio"]
     
-    # Create a copy of the frame
-    result = frame.copy()
+    # Copy the frame into a reused buffer
+    result = get_scratch('audio_waveform.result', frame.shape, frame.dtype)
+    np.copyto(result, frame)
     height, width = result.shape[:2]
     
     # Prepare waveform
@@ -58,19 +65,19 @@ def process_frame(frame, audio_info):
     ]
     
     # Create transparent overlay for waveform
-    overlay = np.zeros_like(result)
+    overlay = get_scratch('audio_waveform.overlay', result.shape, result.dtype)
+    overlay.fill(0)
     
     # Resample audio data to match the width of the frame
     if len(audio_data) > 0:
         # Normalize audio data to -1 to 1 range
-        normalized_data = audio_data / np.max(np.abs(audio_data)) if np.max(np.abs(audio_data)) > 0 else audio_data
+        samples = np.asarray(audio_data, dtype=np.float32).reshape(1, -1)
+        min_val, max_val, _, _ = cv2.minMaxLoc(samples)
+        peak = max(abs(min_val), abs(max_val))
+        normalized_data = samples / peak if peak > 0 else samples
         
-        # Resample to match the width
-        resampled = np.interp(
-            np.linspace(0, len(normalized_data), width),
-            np.arange(len(normalized_data)),
-            normalized_data
-        )
+        # Resample to match the width (linear interpolation along a single row)
+        resampled = cv2.resize(normalized_data, (width, 1), interpolation=cv2.INTER_LINEAR).ravel()
         
         # Scale to fit the waveform height
         scaled_data = resampled * wave_height // 2
@@ -83,10 +90,11 @@ def process_frame(frame, audio_info):
         else:  # center
             base_y = height // 2
         
-        for x in range(width - 1):
-            y1 = int(base_y + scaled_data[x])
-            y2 = int(base_y + scaled_data[x + 1])
-            cv2.line(overlay, (x, y1), (x + 1, y2), current_color, 2, cv2.LINE_AA)
+        # Draw the whole waveform as one polyline
+        points = np.empty((width, 1, 2), dtype=np.int32)
+        points[:, 0, 0] = np.arange(width)
+        points[:, 0, 1] = base_y + scaled_data
+        cv2.polylines(overlay, [points], False, current_color, 2, cv2.LINE_AA)
         
         # Add visualizations for frequency bands
         band_width = width // 8
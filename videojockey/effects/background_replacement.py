@@ -7,24 +7,73 @@ import numpy as np
 import time
 import os
 import random
+import functools
 
-from videojockey.core import config
-from videojockey.core.human_segmentation import HumanSegmentation
+from videojockey.core import config, segmentation_cache
+from videojockey.core.buffers import get_scratch
+from videojockey.core.colors import HUE_TO_BGR
+from videojockey.core.config import DEBUG as _DEBUG
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
+_OUTLINE_KERNEL = np.ones((5, 5), np.uint8)
 bg_index = 0
 last_bg_change = 0
 bg_change_interval = 5.0  # seconds
-background_images = []
-segmentation = HumanSegmentation()
+background_images = []  # generated images and paths of image files, decoded on first use
+
+# Number of decoded background image files kept in memory
+_BACKGROUND_CACHE_SIZE = 8
 
 # Initialize dynamic background parameters
 bg_scroll_x = 0
 bg_scroll_y = 0
 bg_zoom = 1.0
 
+# Last scaled background and the source/zoom it was made from
+_enlarged_bg = None
+_enlarged_source = None
+_enlarged_zoom = None
+
+@functools.lru_cache(maxsize=_BACKGROUND_CACHE_SIZE)
+def _load_background(bg_path):
+    """Load a background image file resized to the video dimensions.
+    
+    Args:
+        bg_path (str): Path to the image file
+        
+    Returns:
+        numpy.ndarray: Decoded image or None if it could not be loaded
+    """
+    try:
+        img = cv2.imread(bg_path)
+        if img is not None:
+            return cv2.resize(img, (1280, 720))
+    except Exception as e:
+        if _DEBUG:
+            print(f"Failed to load background image {bg_path}: {e}")
+    return None
+
+def _get_background(index):
+    """Get a background image, decoding image files on first use.
+    
+    Args:
+        index (int): Index into background_images
+        
+    Returns:
+        numpy.ndarray: Background image; the first background if a file can't be decoded
+    """
+    background = background_images[index]
+    if isinstance(background, str):
+        background = _load_background(background)
+        if background is None:
+            background = background_images[0]
+    return background
+
 def load_backgrounds():
-    """Load background images."""
+    """Collect the background images; image files are only decoded when shown."""
     global background_images
     
     # Clear current backgrounds
@@ -33,44 +82,53 @@ def load_backgrounds():
     # Add some generated backgrounds
     # 1. Colorful gradient
     gradient = np.zeros((720, 1280, 3), dtype=np.uint8)
-    for i in range(1280):
-        color = ((i * 255) // 1280, ((1280 - i) * 255) // 1280, 128)
-        gradient[:, i] = color
+    i = np.arange(1280)
+    gradient[:, :, 0] = (i * 255) // 1280
+    gradient[:, :, 1] = ((1280 - i) * 255) // 1280
+    gradient[:, :, 2] = 128
     background_images.append(gradient)
     
     # 2. Starfield
     starfield = np.zeros((720, 1280, 3), dtype=np.uint8)
-    for _ in range(1000):
-        x = random.randint(0, 1279)
-        y = random.randint(0, 719)
-        brightness = random.randint(100, 255)
-        starfield[y, x] = (brightness, brightness, brightness)
+    xs = np.random.randint(0, 1280, 1000)
+    ys = np.random.randint(0, 720, 1000)
+    brightness = np.random.randint(100, 256, 1000).astype(np.uint8)
+    starfield[ys, xs] = brightness[:, np.newaxis]
     background_images.append(cv2.GaussianBlur(starfield, (3, 3), 0))
     
-    # Load from files if available
+    # Add image files if available
     for bg_path in config.BACKGROUND_IMAGES:
         if os.path.exists(bg_path):
-            try:
-                img = cv2.imread(bg_path)
-                if img is not None:
-                    # Resize to match video dimensions
-                    img = cv2.resize(img, (1280, 720))
-                    background_images.append(img)
-            except Exception as e:
-                if config.DEBUG:
-                    print(f"Failed to load background image {bg_path}: {e}")
+            background_images.append(bg_path)
     
     # If no backgrounds, add a default one
     if not background_images:
         # Create a rainbow background
-        rainbow = np.zeros((720, 1280, 3), dtype=np.uint8)
-        for y in range(720):
-            hue = int((y * 180) / 720)
-            color_hsv = np.uint8([[[hue, 255, 255]]])
-            color_bgr = cv2.cvtColor(color_hsv, cv2.COLOR_HSV2BGR)[0][0]
-            rainbow[y, :] = color_bgr
+        bgr_column = HUE_TO_BGR[(np.arange(720) * 180) // 720][:, None, :]
+        rainbow = np.broadcast_to(bgr_column, (720, 1280, 3)).copy()
         background_images.append(rainbow)
 
+def _get_enlarged_background(background, zoom):
+    """Get the background scaled by `zoom`, reusing the last result while the zoom is unchanged.
+    
+    Args:
+        background (numpy.ndarray): Background image
+        zoom (float): Scale factor, rounded so small changes hit the cache
+        
+    Returns:
+        numpy.ndarray: Scaled background (the background itself at zoom 1.0)
+    """
+    global _enlarged_bg, _enlarged_source, _enlarged_zoom
+    
+    if background is not _enlarged_source or zoom != _enlarged_zoom:
+        if zoom == 1.0:
+            _enlarged_bg = background
+        else:
+            _enlarged_bg = cv2.resize(background, None, fx=zoom, fy=zoom)
+        _enlarged_source = background
+        _enlarged_zoom = zoom
+    return _enlarged_bg
+
 def process_frame(frame, audio_info):
     """Apply background replacement effect to the frame.
     
@@ -95,7 +153,7 @@ def process_frame(frame, audio_info):
         last_bg_change = current_time
     
     # Get current background
-    background = background_images[bg_index].copy()
+    background = _get_background(bg_index)
     
     # Update dynamic background parameters
     if audio_info["beat"]:
@@ -111,7 +169,7 @@ def process_frame(frame, audio_info):
     # Apply background transformations
     # 1. Create larger background for scrolling and zooming
     bg_height, bg_width = background.shape[:2]
-    enlarged_bg = cv2.resize(background, None, fx=bg_zoom, fy=bg_zoom)
+    enlarged_bg = _get_enlarged_background(background, round(bg_zoom, 2))
     
     # 2. Calculate scroll offsets - ensure we don't divide by zero
     if enlarged_bg.shape[1] <= bg_width:
@@ -135,28 +193,26 @@ def process_frame(frame, audio_info):
         visible_bg = cv2.resize(visible_bg, (frame.shape[1], frame.shape[0]))
     
     # Get human segmentation
-    mask, _ = segmentation.segment_human(frame)
+    mask = segmentation_cache.get_mask(frame)
     
     # Apply background replacement
-    result = frame.copy()
-    result[~mask] = visible_bg[~mask]
+    result = get_scratch('background_replacement.result', frame.shape, frame.dtype)
+    np.copyto(result, visible_bg)
+    cv2.copyTo(frame, mask.view(np.uint8), result)
     
     # Add some special effects on beat
     if audio_info["beat"]:
         # Add a flash border around the person
-        outline = np.zeros_like(frame)
-        
-        # Get the outline by dilating the mask and subtracting the original mask
-        mask_single = mask[:, :, 0].astype(np.uint8) * 255
-        kernel = np.ones((5, 5), np.uint8)
-        dilated_mask = cv2.dilate(mask_single, kernel, iterations=2)
-        outline_mask = dilated_mask - mask_single
+        # Get the outline by dilating the 0/1 mask and keeping the pixels it grew into (0/255)
+        mask_single = mask.view(np.uint8)
+        dilated_mask = cv2.dilate(mask_single, _OUTLINE_KERNEL, iterations=2)
+        outline_mask = cv2.compare(dilated_mask, mask_single, cv2.CMP_GT)
         
-        # Create a colored outline that pulses with the beat
-        outline_color = [255, 255, 255]  # White outline
-        outline[outline_mask > 0] = outline_color
+        # Create a white outline that pulses with the beat
+        outline = get_scratch('background_replacement.outline', frame.shape, frame.dtype)
+        cv2.cvtColor(outline_mask, cv2.COLOR_GRAY2BGR, dst=outline)
         
         # Add the outline to the result
-        result = cv2.addWeighted(result, 0.7, outline, 0.3, 0)
+        cv2.addWeighted(result, 0.7, outline, 0.3, 0, dst=result)
     
     return result
\ No newline at end of file
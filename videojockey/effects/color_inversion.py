@@ -6,6 +6,11 @@ import cv2
 import numpy as np
 import time
 
+from videojockey.core.buffers import get_scratch
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
+
 # Effect parameters
 last_beat_time = 0
 is_inverted = False
@@ -35,11 +40,10 @@ def process_frame(frame, audio_info):
         # Calculate smooth transition for inversion
         progress = 1.0 - (current_time - last_beat_time) / inversion_duration
         
-        # Create inverted frame
-        inverted = cv2.bitwise_not(frame)
-        
-        # Blend between original and inverted based on progress
-        output = cv2.addWeighted(frame, 1.0 - progress, inverted, progress, 0)
+        # Blending x with its inverse is linear in x: (1-p)*x + p*(255-x) = (1-2p)*x + 255p,
+        # which never goes negative, so one scale-and-offset pass does the whole blend
+        output = get_scratch('color_inversion.output', frame.shape, frame.dtype)
+        cv2.convertScaleAbs(frame, output, 1.0 - 2.0 * progress, 255.0 * progress)
         return output
     else:
         is_inverted = False
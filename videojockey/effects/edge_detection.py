@@ -6,12 +6,32 @@ import cv2
 import numpy as np
 import time
 
+from videojockey.core.buffers import get_scratch
+from videojockey.core.colors import hue_to_bgr
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
+
 # Effect parameters
 threshold1 = 50
 threshold2 = 150
 edge_color = [0, 255, 255]  # Yellow by default
 last_color_change = 0
 color_change_interval = 1.0  # seconds
+detection_scale = 0.5  # Edges are detected at this fraction of the frame size
+_color_plate = None  # Full frame filled with edge_color, rebuilt when the color or size changes
+_color_plate_color = None
+
+def _get_color_plate(shape):
+    """Get a frame-sized array filled with the current edge color."""
+    global _color_plate, _color_plate_color
+    
+    color = tuple(edge_color)
+    if _color_plate is None or _color_plate.shape != shape or _color_plate_color != color:
+        _color_plate = np.empty(shape, dtype=np.uint8)
+        _color_plate[:] = color
+        _color_plate_color = color
+    return _color_plate
 
 def process_frame(frame, audio_info):
     """Apply edge detection with colorful edges to the frame.
@@ -37,24 +57,30 @@ def process_frame(frame, audio_info):
         if current_time - last_color_change > color_change_interval:
             # Generate new neon color
             hue = np.random.randint(0, 180)  # Hue in HSV
-            edge_color = cv2.cvtColor(np.uint8([[[hue, 255, 255]]]), cv2.COLOR_HSV2BGR)[0][0].tolist()
+            edge_color = hue_to_bgr(hue)
             last_color_change = current_time
     
-    # Convert to grayscale for edge detection
+    # Convert to grayscale and shrink for edge detection
+    height, width = frame.shape[:2]
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small_size = (max(1, int(width * detection_scale)), max(1, int(height * detection_scale)))
+    small_gray = cv2.resize(gray, small_size, interpolation=cv2.INTER_AREA)
     
-    # Apply Gaussian blur to reduce noise
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    # Apply Gaussian blur to reduce noise; area downscaling already smooths, so a smaller kernel will do
+    blurred = cv2.GaussianBlur(small_gray, (3, 3), 0)
     
-    # Apply Canny edge detection
+    # Apply Canny edge detection and scale the edges back up to the frame size
     edges = cv2.Canny(blurred, current_threshold1, current_threshold2)
+    edges = cv2.resize(edges, (width, height), interpolation=cv2.INTER_NEAREST)
     
     # Create color mask for edges
-    color_mask = np.zeros_like(frame)
-    color_mask[edges > 0] = edge_color
+    color_mask = get_scratch('edge_detection.color_mask', frame.shape, frame.dtype)
+    color_mask.fill(0)
+    cv2.copyTo(_get_color_plate(frame.shape), edges, color_mask)
     
     # Blend original with colored edges
     edge_strength = 0.7 + 0.3 * volume_boost  # Edge visibility increases with volume
-    output = cv2.addWeighted(frame, 1.0 - edge_strength, color_mask, edge_strength, 0)
+    output = get_scratch('edge_detection.output', frame.shape, frame.dtype)
+    cv2.addWeighted(frame, 1.0 - edge_strength, color_mask, edge_strength, 0, dst=output)
     
     return output
\ No newline at end of file
@@ -7,50 +7,58 @@ import numpy as np
 import random
 import time
 import math
+from numba import njit
 
-from videojockey.core.human_segmentation import HumanSegmentation
+from videojockey.core import segmentation_cache
+from videojockey.core.buffers import get_scratch
+from videojockey.core.colors import hue_to_bgr
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
-segmentation = HumanSegmentation()
 fireworks = []  # List of active fireworks
 last_firework_time = 0
 min_firework_interval = 0.2  # seconds
 particle_lifetime = 1.0  # seconds
 
-class Particle:
-    """Represents a single particle in a firework explosion."""
+@njit(nogil=True, fastmath=True, cache=True)
+def _step_particles(x, y, velocity_x, velocity_y, gravity):
+    """Advance every particle by its velocity and apply gravity in one pass."""
+    for i in range(x.size):
+        x[i] += velocity_x[i]
+        y[i] += velocity_y[i]
+        velocity_y[i] += gravity
+
+@njit(nogil=True, fastmath=True, cache=True)
+def _splat_particles(frame, x, y, radius, colors):
+    """Draw every particle as an antialiased filled disk in one pass.
     
-    def __init__(self, x, y, color, velocity_x, velocity_y):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.gravity = 0.2
-        self.alpha = 1.0  # Full opacity
-        self.create_time = time.time()
-        self.alive = True
-        
-    def update(self):
-        """Update the particle position."""
-        # Apply velocity
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        
-        # Apply gravity
-        self.velocity_y += self.gravity
-        
-        # Reduce alpha based on lifetime
-        current_time = time.time()
-        elapsed = current_time - self.create_time
-        self.alpha = max(0, 1.0 - elapsed / particle_lifetime)
-        
-        # Kill particle if alpha reaches 0
-        if self.alpha <= 0:
-            self.alive = False
+    Coverage falls off linearly over the last pixel of the radius, so edges
+    blend with the frame much like cv2.LINE_AA circles.
+    """
+    height, width = frame.shape[:2]
+    for i in range(x.size):
+        r = radius[i]
+        x0 = max(0, int(x[i] - r - 1.0))
+        x1 = min(width, int(x[i] + r + 2.0))
+        y0 = max(0, int(y[i] - r - 1.0))
+        y1 = min(height, int(y[i] + r + 2.0))
+        for py in range(y0, y1):
+            dy = py - y[i]
+            for px in range(x0, x1):
+                dx = px - x[i]
+                coverage = r + 0.5 - np.sqrt(dx * dx + dy * dy)
+                if coverage <= 0.0:
+                    continue
+                if coverage > 1.0:
+                    coverage = 1.0
+                for c in range(3):
+                    value = frame[py, px, c] * (1.0 - coverage) + colors[i, c] * coverage
+                    frame[py, px, c] = np.uint8(value + 0.5)
 
 class Firework:
-    """Represents a firework explosion with multiple particles."""
+    """Represents a firework explosion with its particles stored as parallel arrays."""
     
     def __init__(self, x, y, color=None, intensity=1.0):
         self.x = x
@@ -60,67 +68,60 @@ class Firework:
         if color is None:
             # Create a bright, saturated color
             hue = random.randint(0, 180)  # Hue in HSV
-            color_hsv = np.uint8([[[hue, 255, 255]]])
-            self.color = cv2.cvtColor(color_hsv, cv2.COLOR_HSV2BGR)[0][0].tolist()
+            self.color = hue_to_bgr(hue)
         else:
             self.color = color
             
-        # Create particles
-        self.particles = []
+        # Create particles with random velocities in all directions
         num_particles = int(20 + 30 * intensity)
+        angle = np.random.uniform(0, 2 * math.pi, num_particles)
+        speed = np.random.uniform(2, 5 + 3 * intensity, num_particles)
+        self.particle_x = np.full(num_particles, x, dtype=np.float32)
+        self.particle_y = np.full(num_particles, y, dtype=np.float32)
+        self.velocity_x = (speed * np.cos(angle)).astype(np.float32)
+        self.velocity_y = (speed * np.sin(angle)).astype(np.float32)
         
-        for _ in range(num_particles):
-            # Random velocity in all directions
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(2, 5 + 3 * intensity)
-            velocity_x = speed * math.cos(angle)
-            velocity_y = speed * math.sin(angle)
-            
-            # Slightly vary the color for each particle
-            color_variation = [
-                min(255, max(0, self.color[0] + random.randint(-20, 20))),
-                min(255, max(0, self.color[1] + random.randint(-20, 20))),
-                min(255, max(0, self.color[2] + random.randint(-20, 20)))
-            ]
-            
-            # Create particle
-            particle = Particle(x, y, color_variation, velocity_x, velocity_y)
-            self.particles.append(particle)
-            
+        # Slightly vary the color for each particle
+        variation = np.random.randint(-20, 21, size=(num_particles, 3))
+        self.particle_colors = np.clip(np.array(self.color) + variation, 0, 255).astype(np.float32)
+        
+        # All particles of a firework are born together, so they share one fade
+        self.gravity = 0.2
+        self.alpha = 1.0  # Full opacity
+        self.create_time = time.time()
         self.alive = True
         
     def update(self):
         """Update all particles in the firework."""
-        for particle in self.particles[:]:
-            particle.update()
-            if not particle.alive:
-                self.particles.remove(particle)
-                
-        # Kill firework if no particles left
-        if not self.particles:
+        _step_particles(self.particle_x, self.particle_y, self.velocity_x, self.velocity_y, self.gravity)
+        
+        # Reduce alpha based on lifetime and kill the firework once it fades out
+        elapsed = time.time() - self.create_time
+        self.alpha = max(0, 1.0 - elapsed / particle_lifetime)
+        if self.alpha <= 0:
             self.alive = False
             
-    def draw(self, frame):
-        """Draw all particles on the frame."""
-        for particle in self.particles:
-            # Calculate alpha-adjusted color
-            color = [
-                int(particle.color[0] * particle.alpha),
-                int(particle.color[1] * particle.alpha),
-                int(particle.color[2] * particle.alpha)
-            ]
-            
-            # Draw the particle as a small circle
-            cv2.circle(
-                frame, 
-                (int(particle.x), int(particle.y)), 
-                int(2 + particle.alpha * 2),  # Size fades with alpha
-                color, 
-                -1,  # Filled circle
-                cv2.LINE_AA
-            )
-            
-        return frame
+    def get_draw_arrays(self):
+        """Get the particle radii and alpha-adjusted colors for drawing.
+        
+        Returns:
+            tuple: (radius, colors) float32 arrays matching particle_x/particle_y
+        """
+        radius = np.full(self.particle_x.size, 2 + self.alpha * 2, dtype=np.float32)  # Size fades with alpha
+        colors = self.particle_colors * np.float32(self.alpha)
+        return radius, colors
+
+def init_effect(width, height):
+    """Compile the particle kernel ahead of time so the first beat doesn't stall.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    dummy = np.zeros(1, dtype=np.float32)
+    _step_particles(dummy, dummy.copy(), dummy.copy(), dummy.copy(), 0.2)
+    _splat_particles(np.zeros((2, 2, 3), dtype=np.uint8), dummy, dummy, dummy,
+                     np.zeros((1, 3), dtype=np.float32))
 
 def process_frame(frame, audio_info):
     """Apply fireworks effect to the frame.
@@ -136,15 +137,16 @@ def process_frame(frame, audio_info):
     
     current_time = time.time()
     
+    # Feed segmentation every frame so the mask is current when a beat arrives;
+    # it runs in the background and only returns the latest finished mask
+    mask = segmentation_cache.get_mask(frame)
+    
     # Generate new fireworks on beat
     if audio_info["beat"] and current_time - last_firework_time > min_firework_interval:
         last_firework_time = current_time
         
-        # Look for humans to launch fireworks from
-        mask, _ = segmentation.segment_human(frame)
-        
         # Find human head position (assume top of human silhouette)
-        mask_uint8 = (mask[:,:,0] * 255).astype(np.uint8)
+        mask_uint8 = (mask * 255).astype(np.uint8)
         if np.any(mask_uint8):
             # Find contours
             contours, _ = cv2.findContours(mask_uint8, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -169,12 +171,23 @@ def process_frame(frame, audio_info):
             fireworks.append(firework)
     
     # Update and draw existing fireworks
-    result = frame.copy()
-    for firework in fireworks[:]:
+    result = get_scratch('fireworks.result', frame.shape, frame.dtype)
+    np.copyto(result, frame)
+    for firework in fireworks:
         firework.update()
-        if firework.alive:
-            result = firework.draw(result)
-        else:
-            fireworks.remove(firework)
+            
+    # Drop finished fireworks in a single pass
+    fireworks[:] = [firework for firework in fireworks if firework.alive]
+    
+    # Gather the particles of all fireworks and draw them in a single kernel call
+    if fireworks:
+        draw_arrays = [firework.get_draw_arrays() for firework in fireworks]
+        _splat_particles(
+            result,
+            np.concatenate([firework.particle_x for firework in fireworks]),
+            np.concatenate([firework.particle_y for firework in fireworks]),
+            np.concatenate([radius for radius, _ in draw_arrays]),
+            np.concatenate([colors for _, colors in draw_arrays])
+        )
     
     return result
\ No newline at end of file
@@ -2,10 +2,14 @@
 Glitch effect that creates digital distortion effects on beat.
 """
 
-import cv2
 import numpy as np
-import random
 import time
+from numba import njit, prange
+
+from videojockey.core.buffers import get_scratch
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
 last_glitch_time = 0
@@ -15,6 +19,41 @@ channel_shift = 5
 block_size = 30
 intensity = 0.5  # Base intensity
 
+# One generator for all of the effect's randomness
+_rng = np.random.default_rng()
+
+@njit(parallel=True, nogil=True, cache=True)
+def _sprinkle_noise(frame, probability, seed):
+    """Replace a random fraction of pixels with random colors, in place.
+    
+    Each row runs its own xorshift32 generator, so no full-frame noise image
+    or probability mask is allocated.
+    """
+    height, width, channels = frame.shape
+    threshold = np.uint64(probability * 4294967296.0)
+    for y in prange(height):
+        state = ((seed + y * 2654435761) & 0xFFFFFFFF) | 1
+        for x in range(width):
+            state ^= (state << 13) & 0xFFFFFFFF
+            state ^= state >> 17
+            state ^= (state << 5) & 0xFFFFFFFF
+            if state < threshold:
+                # Draw the replacement color from the next value
+                state ^= (state << 13) & 0xFFFFFFFF
+                state ^= state >> 17
+                state ^= (state << 5) & 0xFFFFFFFF
+                for c in range(channels):
+                    frame[y, x, c] = (state >> (8 * c)) & 0xFF
+
+def init_effect(width, height):
+    """Compile the noise kernel ahead of time so the first glitch doesn't stall.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    _sprinkle_noise(np.zeros((2, 2, 3), dtype=np.uint8), 0.5, 1)
+
 def process_frame(frame, audio_info):
     """Apply glitch effect to the frame.
     
@@ -51,67 +90,57 @@ def process_frame(frame, audio_info):
     # Calculate glitch intensity
     current_intensity = intensity * (1.0 - time_since_glitch / glitch_duration)
     
-    # Create a copy of the frame
-    result = frame.copy()
+    # Start from a copy of the frame in a reused buffer
+    result = get_scratch("glitch.result", frame.shape)
+    np.copyto(result, frame)
     height, width = result.shape[:2]
     
-    # Apply random glitch effects based on intensity
+    # Apply random glitch effects based on intensity; draw all four decisions at once
+    decisions = _rng.random(4)
     
     # 1. Color channel shifting
-    if random.random() < current_intensity * 0.8:
-        # Separate the color channels
-        b, g, r = cv2.split(result)
-        
-        # Shift the red channel horizontally
-        shift_amount = int(random.uniform(-channel_shift, channel_shift))
-        if shift_amount > 0:
-            r = np.hstack((r[:, shift_amount:], r[:, :shift_amount]))
-        elif shift_amount < 0:
-            shift_amount = abs(shift_amount)
-            r = np.hstack((r[:, -shift_amount:], r[:, :-shift_amount]))
-        
-        # Shift the blue channel horizontally in the opposite direction
-        shift_amount = int(random.uniform(-channel_shift, channel_shift))
-        if shift_amount > 0:
-            b = np.hstack((b[:, shift_amount:], b[:, :shift_amount]))
-        elif shift_amount < 0:
-            shift_amount = abs(shift_amount)
-            b = np.hstack((b[:, -shift_amount:], b[:, :-shift_amount]))
+    if decisions[0] < current_intensity * 0.8:
+        # Shift the red channel horizontally, and the blue one independently
+        red_shift, blue_shift = _rng.uniform(-channel_shift, channel_shift, 2).astype(int).tolist()
         
-        # Merge the channels back together
-        result = cv2.merge((b, g, r))
+        # Write each shifted channel straight from the untouched input frame,
+        # wrapping around at the edges (a negative shift wraps to a right shift)
+        for channel, shift_amount in ((2, red_shift), (0, blue_shift)):
+            shift_amount %= width
+            if shift_amount:
+                result[:, :-shift_amount, channel] = frame[:, shift_amount:, channel]
+                result[:, -shift_amount:, channel] = frame[:, :shift_amount, channel]
     
     # 2. Random block displacement
-    if random.random() < current_intensity * 0.7:
+    if decisions[1] < current_intensity * 0.7:
         num_blocks = int(current_intensity * 5) + 1
-        for _ in range(num_blocks):
-            # Select random block
-            block_x = random.randint(0, width - block_size)
-            block_y = random.randint(0, height - block_size)
-            
-            # Select random destination
-            dest_x = int(block_x + random.uniform(-30, 30))
-            dest_y = int(block_y + random.uniform(-10, 10))
-            
-            # Make sure destination is within bounds
-            dest_x = max(0, min(width - block_size, dest_x))
-            dest_y = max(0, min(height - block_size, dest_y))
-            
-            # Copy block to new destination
-            block = result[block_y:block_y+block_size, block_x:block_x+block_size].copy()
-            result[dest_y:dest_y+block_size, dest_x:dest_x+block_size] = block
+        
+        # Select random blocks
+        block_xs = _rng.integers(0, width - block_size + 1, num_blocks)
+        block_ys = _rng.integers(0, height - block_size + 1, num_blocks)
+        
+        # Select random destinations, kept within bounds
+        dest_xs = np.clip((block_xs + _rng.uniform(-30, 30, num_blocks)).astype(int), 0, width - block_size)
+        dest_ys = np.clip((block_ys + _rng.uniform(-10, 10, num_blocks)).astype(int), 0, height - block_size)
+        
+        for block_x, block_y, dest_x, dest_y in zip(block_xs.tolist(), block_ys.tolist(),
+                                                    dest_xs.tolist(), dest_ys.tolist()):
+            # Copy block to new destination (numpy handles the overlap)
+            result[dest_y:dest_y+block_size, dest_x:dest_x+block_size] = \
+                result[block_y:block_y+block_size, block_x:block_x+block_size]
     
     # 3. Horizontal scan lines
-    if random.random() < current_intensity * 0.6:
+    if decisions[2] < current_intensity * 0.6:
         num_lines = int(10 * current_intensity) + 1
         line_height = int(3 * current_intensity) + 1
+        line = get_scratch("glitch.line", (line_height, width, 3))
         
-        for _ in range(num_lines):
-            y = random.randint(0, height - line_height)
+        line_ys = _rng.integers(0, height - line_height + 1, num_lines)
+        shifts = _rng.uniform(-20, 20, num_lines).astype(int)
+        for y, shift in zip(line_ys.tolist(), shifts.tolist()):
             # Shift the scanline horizontally
-            shift = int(random.uniform(-20, 20))
             if shift != 0:
-                line = result[y:y+line_height, :].copy()
+                np.copyto(line, result[y:y+line_height, :])
                 if shift > 0:
                     result[y:y+line_height, shift:] = line[:, :-shift]
                     result[y:y+line_height, :shift] = line[:, -shift:]
@@ -121,11 +150,7 @@ def process_frame(frame, audio_info):
                     result[y:y+line_height, -shift:] = line[:, :shift]
     
     # 4. Noise
-    if random.random() < current_intensity * 0.5:
-        noise = np.zeros_like(result)
-        cv2.randu(noise, 0, 255)
-        noise_mask = np.random.random(result.shape[:2])
-        noise_mask = (noise_mask < current_intensity * 0.1).reshape(height, width, 1)
-        result = np.where(noise_mask, noise, result)
+    if decisions[3] < current_intensity * 0.5:
+        _sprinkle_noise(result, current_intensity * 0.1, int(_rng.integers(1 << 31)))
     
     return result
\ No newline at end of file
@@ -6,10 +6,15 @@ import cv2
 import numpy as np
 import time
 
-from videojockey.core.human_segmentation import HumanSegmentation
+from videojockey.core.colors import hue_to_bgr
+from videojockey.core import segmentation_cache
+from videojockey.core.buffers import get_scratch
+from videojockey.core.opencl import opencl_enabled
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
-segmentation = HumanSegmentation()
 halo_size = 20
 halo_color = [0, 200, 255]  # Orange by default
 halo_alpha = 0.7
@@ -17,6 +22,19 @@ last_color_change = 0
 color_change_interval = 1.0  # seconds
 halo_pulse = 0.0  # Current pulse amount
 
+# The halo is built at this fraction of the frame size; it is blurred anyway
+halo_scale = 0.5
+
+# Iterating a 3x3 rectangle n times dilates exactly like a (2n+1)x(2n+1) rectangle
+_DILATE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
+# Frequency band modulating each BGR channel of the halo color
+_COLOR_BANDS = [7, 3, 0]
+
+def _scratch(key, shape, use_umat):
+    """Get a scratch buffer for a cv2 dst argument, or None to let OpenCV allocate a UMat."""
+    return None if use_umat else get_scratch(key, shape)
+
 def process_frame(frame, audio_info):
     """Apply halo effect to humans in the frame.
     
@@ -36,7 +54,7 @@ def process_frame(frame, audio_info):
         if current_time - last_color_change > color_change_interval:
             # Generate new color
             hue = np.random.randint(0, 180)  # Hue in HSV
-            halo_color = cv2.cvtColor(np.uint8([[[hue, 255, 255]]]), cv2.COLOR_HSV2BGR)[0][0].tolist()
+            halo_color = hue_to_bgr(hue)
             last_color_change = current_time
     
     # Adjust halo size based on beat
@@ -52,43 +70,53 @@ def process_frame(frame, audio_info):
     current_alpha = min(0.9, halo_alpha * (1.0 + audio_info["volume"] * 0.5))
     
     # Segment humans in the frame
-    mask, segmented = segmentation.segment_human(frame)
+    mask = segmentation_cache.get_mask(frame)
+    
+    # Run the OpenCV chain below on OpenCL when enabled
+    use_umat = opencl_enabled()
     
-    # Convert mask to single channel
-    mask_single = mask[:, :, 0].astype(np.uint8) * 255
+    # Convert mask to uint8 at the reduced halo resolution
+    height, width = frame.shape[:2]
+    small_size = (max(1, int(width * halo_scale)), max(1, int(height * halo_scale)))
+    mask_small = cv2.resize(mask.view(np.uint8), small_size, interpolation=cv2.INTER_NEAREST)
+    if use_umat:
+        mask_small = cv2.UMat(mask_small)
+    mask_single = cv2.compare(mask_small, 0, cv2.CMP_GT)
     
-    # Create a dilated mask for the halo
-    kernel = np.ones((current_halo_size, current_halo_size), np.uint8)
-    dilated_mask = cv2.dilate(mask_single, kernel, iterations=1)
+    # Create a dilated mask for the halo, with the radius scaled to match
+    iterations = max(1, int(current_halo_size // 2 * halo_scale))
+    dilated_mask = cv2.dilate(mask_single, _DILATE_KERNEL, iterations=iterations)
     
     # Subtract the original mask to get only the halo region
     halo_region = cv2.subtract(dilated_mask, mask_single)
     
-    # Create halo effect
-    result = frame.copy()
-    
-    # Create a colored halo with current color
-    halo_overlay = np.zeros_like(frame)
-    
-    # Create a pulsing color based on audio frequency bands
-    bass = audio_info["frequency_bands"][0] * 5
-    mid = audio_info["frequency_bands"][3] * 5
-    high = audio_info["frequency_bands"][7] * 5
+    # Create a pulsing color based on audio frequency bands: high drives blue,
+    # mid green and bass red
+    bands = np.asarray(audio_info["frequency_bands"])[_COLOR_BANDS] * 5
     
     # Modulate color with frequency bands
-    color = [
-        min(255, int(halo_color[0] * (1.0 + high * 0.5))),
-        min(255, int(halo_color[1] * (1.0 + mid * 0.5))),
-        min(255, int(halo_color[2] * (1.0 + bass * 0.5)))
-    ]
-    
-    # Apply the color to the halo region
-    halo_overlay[halo_region > 0] = color
-    
-    # Apply Gaussian blur to the halo for a glowing effect
-    halo_overlay = cv2.GaussianBlur(halo_overlay, (15, 15), 0)
-    
-    # Blend the halo with the original frame
-    cv2.addWeighted(result, 1.0, halo_overlay, current_alpha, 0, result)
+    color = np.minimum(255, np.multiply(halo_color, 1.0 + bands * 0.5)).astype(int).tolist()
+    
+    # Create a colored halo with current color, pre-scaled by the blend alpha; blur
+    # and resize are linear, so the halo can simply be added to the frame afterwards.
+    # The region is 0/255, so scaling it by color / 255 paints the color into it.
+    halo_overlay = cv2.cvtColor(halo_region, cv2.COLOR_GRAY2BGR,
+                                dst=_scratch("halo_effect.overlay", (small_size[1], small_size[0], 3), use_umat))
+    halo_overlay = cv2.multiply(halo_overlay, tuple(int(c * current_alpha + 0.5) / 255.0 for c in color) + (0,),
+                                dst=halo_overlay)
+    
+    # Apply Gaussian blur to the halo for a glowing effect (15x15 at full size),
+    # then scale it back up; the upscale smooths it further
+    blur_size = max(3, int(15 * halo_scale) | 1)
+    halo_blurred = cv2.GaussianBlur(halo_overlay, (blur_size, blur_size), 0,
+                                    dst=_scratch("halo_effect.blurred", (small_size[1], small_size[0], 3), use_umat))
+    halo_full = cv2.resize(halo_blurred, (width, height), dst=_scratch("halo_effect.overlay_full", frame.shape, use_umat),
+                           interpolation=cv2.INTER_LINEAR)
+    
+    # Add the halo to the original frame with a saturating uint8 add
+    if use_umat:
+        return cv2.add(cv2.UMat(frame), halo_full).get()
+    result = get_scratch("halo_effect.result", frame.shape)
+    cv2.add(frame, halo_full, dst=result)
     
     return result
\ No newline at end of file
@@ -5,6 +5,11 @@ Optimized kaleidoscope effect using vectorized operations.
 import cv2
 import numpy as np
 import math
+from collections import OrderedDict
+from numba import njit, prange
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
 segments = 6
@@ -12,6 +17,91 @@ center_x_offset = 0
 center_y_offset = 0
 zoom_level = 1.0
 
+# Frames are processed at half size
+scale_factor = 0.5
+
+# Remap tables keyed by size, segments and quantized zoom/center (least recently used first)
+_map_cache = OrderedDict()
+_map_cache_size = 32
+_ZOOM_STEP = 0.02
+_CENTER_STEP = 4  # pixels at full resolution
+
+@njit(parallel=True, nogil=True, fastmath=True, cache=True)
+def _build_maps(center_x, center_y, zoom, num_segments, map_x, map_y):
+    """Fill remap tables that fold the frame into mirrored kaleidoscope segments.
+    
+    Each pixel's polar angle around the center is wrapped into the first segment,
+    mirrored in every other segment, and turned back into source coordinates.
+    
+    Args:
+        center_x (int): Kaleidoscope center column
+        center_y (int): Kaleidoscope center row
+        zoom (float): Zoom factor
+        num_segments (int): Number of mirrored segments
+        map_x (numpy.ndarray): float32 (height, width) output source columns
+        map_y (numpy.ndarray): float32 (height, width) output source rows
+    """
+    height, width = map_x.shape
+    segment_angle = 2 * np.pi / num_segments
+    inv_zoom = 1.0 / zoom
+    for y in prange(height):
+        dy = (y - center_y) * inv_zoom
+        for x in range(width):
+            dx = (x - center_x) * inv_zoom
+            radius = np.sqrt(dx * dx + dy * dy)
+            angle = np.arctan2(dy, dx)
+            
+            # Wrap angle to first segment, mirroring odd segments
+            segment_num = np.floor(angle / segment_angle)
+            angle_segment = angle - segment_num * segment_angle
+            if int(segment_num) & 1:
+                angle_segment = segment_angle - angle_segment
+            
+            # Convert back to Cartesian coordinates, clipped to image bounds
+            map_x[y, x] = min(max(center_x + radius * np.cos(angle_segment), 0.0), width - 1.0)
+            map_y[y, x] = min(max(center_y + radius * np.sin(angle_segment), 0.0), height - 1.0)
+
+def init_effect(width, height):
+    """Compile the remap table kernel ahead of time so switching to the effect doesn't stall.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    _get_maps(round(height * scale_factor), round(width * scale_factor),
+              round(width * scale_factor) // 2, round(height * scale_factor) // 2, 1.0, segments)
+
+def _get_maps(height, width, center_x, center_y, zoom, num_segments):
+    """Get the remap tables that fold the frame into kaleidoscope segments.
+    
+    Args:
+        height (int): Height of the downsampled frame
+        width (int): Width of the downsampled frame
+        center_x (int): Kaleidoscope center column
+        center_y (int): Kaleidoscope center row
+        zoom (float): Zoom factor
+        num_segments (int): Number of mirrored segments
+        
+    Returns:
+        tuple: (map_x, map_y) float32 arrays for cv2.remap
+    """
+    key = (height, width, center_x, center_y, zoom, num_segments)
+    maps = _map_cache.get(key)
+    if maps is not None:
+        _map_cache.move_to_end(key)
+        return maps
+        
+    # Build the tables in one fused pass over the pixels
+    map_x = np.empty((height, width), dtype=np.float32)
+    map_y = np.empty((height, width), dtype=np.float32)
+    _build_maps(center_x, center_y, zoom, num_segments, map_x, map_y)
+    
+    maps = (map_x, map_y)
+    _map_cache[key] = maps
+    if len(_map_cache) > _map_cache_size:
+        _map_cache.popitem(last=False)
+    return maps
+
 def process_frame(frame, audio_info):
     """Apply a kaleidoscope effect to the frame using vectorized operations.
     
@@ -42,52 +132,24 @@ def process_frame(frame, audio_info):
     
     # Create kaleidoscope effect
     height, width = frame.shape[:2]
-    center_x = width // 2 + center_x_offset
-    center_y = height // 2 + center_y_offset
+    
+    # Quantize the zoom and center so nearby values share cached remap tables
+    zoom_key = round(current_zoom / _ZOOM_STEP) * _ZOOM_STEP
+    offset_x = round(center_x_offset / _CENTER_STEP) * _CENTER_STEP
+    offset_y = round(center_y_offset / _CENTER_STEP) * _CENTER_STEP
     
     # Downsample the frame for speed
-    scale_factor = 0.5
     small_frame = cv2.resize(frame, None, fx=scale_factor, fy=scale_factor, 
                             interpolation=cv2.INTER_LINEAR)
     small_height, small_width = small_frame.shape[:2]
-    small_center_x = small_width // 2 + int(center_x_offset * scale_factor)
-    small_center_y = small_height // 2 + int(center_y_offset * scale_factor)
-    
-    # Create coordinate meshgrid
-    y_coords, x_coords = np.mgrid[0:small_height, 0:small_width]
-    
-    # Calculate polar coordinates
-    dx = x_coords - small_center_x
-    dy = y_coords - small_center_y
-    
-    # Apply zoom
-    dx = dx / current_zoom
-    dy = dy / current_zoom
-    
-    # Calculate radius and angle
-    radius = np.sqrt(dx**2 + dy**2)
-    angle = np.arctan2(dy, dx)
-    
-    # Calculate segment angle
-    segment_angle = 2 * np.pi / segments
-    
-    # Wrap angle to first segment
-    segment_num = np.floor(angle / segment_angle)
-    angle_segment = angle % segment_angle
-    flip_mask = (segment_num.astype(int) % 2) == 1
-    angle_segment[flip_mask] = segment_angle - angle_segment[flip_mask]
-    
-    # Convert back to Cartesian coordinates
-    source_x = small_center_x + radius * np.cos(angle_segment)
-    source_y = small_center_y + radius * np.sin(angle_segment)
-    
-    # Clip coordinates to image bounds
-    source_x = np.clip(source_x, 0, small_width - 1).astype(np.int32)
-    source_y = np.clip(source_y, 0, small_height - 1).astype(np.int32)
-    
-    # Create output image
-    small_output = np.zeros_like(small_frame)
-    small_output[y_coords, x_coords] = small_frame[source_y, source_x]
+    small_center_x = small_width // 2 + int(offset_x * scale_factor)
+    small_center_y = small_height // 2 + int(offset_y * scale_factor)
+    
+    # Fold the frame into segments with a cached lookup table
+    map_x, map_y = _get_maps(small_height, small_width, small_center_x, small_center_y,
+                             zoom_key, segments)
+    small_output = cv2.remap(small_frame, map_x, map_y, cv2.INTER_LINEAR,
+                             borderMode=cv2.BORDER_REFLECT)
     
     # Resize back to original size
     output = cv2.resize(small_output, (width, height), interpolation=cv2.INTER_LINEAR)
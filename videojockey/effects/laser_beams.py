@@ -7,18 +7,36 @@ import numpy as np
 import time
 import random
 import math
+from numba import njit, prange
 
-from videojockey.core.human_segmentation import HumanSegmentation
+from videojockey.core import segmentation_cache
+from videojockey.core.buffers import get_scratch
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
-segmentation = HumanSegmentation()
 last_beat_time = 0
-lasers = []  # List of active laser beams
 max_lasers = 10
 laser_lifetime = 0.8  # seconds
 last_laser_time = 0
 min_laser_interval = 0.1  # seconds
 
+# Active laser beams, one slot per laser
+_active = np.zeros(max_lasers, dtype=bool)
+_start_xy = np.zeros((max_lasers, 2), dtype=np.float32)
+_angle = np.zeros(max_lasers, dtype=np.float32)
+_length = np.zeros(max_lasers, dtype=np.float32)
+_max_length = np.zeros(max_lasers, dtype=np.float32)
+_speed = np.zeros(max_lasers, dtype=np.float32)
+_create_time = np.zeros(max_lasers, dtype=np.float64)  # float32 can't hold epoch seconds
+_color = np.zeros((max_lasers, 3), dtype=np.float32)
+_thickness = np.zeros(max_lasers, dtype=np.int32)
+
+# Glow falloff around each beam (pixels)
+_GLOW_SIGMA = 2.0
+_GLOW_REACH = 3 * _GLOW_SIGMA
+
 # Laser colors in BGR format
 LASER_COLORS = [
     (0, 0, 255),    # Red
@@ -28,57 +46,103 @@ LASER_COLORS = [
     (255, 0, 255),  # Magenta
 ]
 
-class Laser:
-    """Represents a laser beam."""
+@njit(parallel=True, nogil=True, fastmath=True, cache=True)
+def _rasterize_lasers(frame, segments, colors, half_widths, glow_strengths):
+    """Draw all laser beams with their glow in place, one pass per beam.
     
-    def __init__(self, start_x, start_y, angle, color, speed=30, thickness=2):
-        self.start_x = start_x
-        self.start_y = start_y
-        self.angle = angle  # Radians
-        self.length = 20  # Initial length
-        self.max_length = random.randint(100, 500)
-        self.color = color
-        self.speed = speed
-        self.thickness = thickness
-        self.create_time = time.time()
-        self.alive = True
-        
-    def update(self):
-        """Update the laser beam."""
-        current_time = time.time()
-        time_alive = current_time - self.create_time
+    Pixels within a beam's half width get its color; beyond that a Gaussian glow
+    scaled by the beam's glow strength is blended over the frame.
+    
+    Args:
+        frame (numpy.ndarray): uint8 BGR frame to draw on
+        segments (numpy.ndarray): (N, 4) float32 beam start/end points (x0, y0, x1, y1)
+        colors (numpy.ndarray): (N, 3) float32 BGR colors
+        half_widths (numpy.ndarray): (N,) float32 half beam widths
+        glow_strengths (numpy.ndarray): (N,) float32 glow opacities (0-1)
+    """
+    height, width = frame.shape[:2]
+    glow_scale = -0.5 / (_GLOW_SIGMA * _GLOW_SIGMA)
+    for i in range(segments.shape[0]):
+        x0, y0, x1, y1 = segments[i, 0], segments[i, 1], segments[i, 2], segments[i, 3]
+        half_width = half_widths[i]
+        reach = half_width + _GLOW_REACH
         
-        # Grow the laser up to max_length
-        if self.length < self.max_length:
-            self.length += self.speed
+        # Only visit the beam's bounding box
+        left = max(0, int(min(x0, x1) - reach))
+        right = min(width, int(max(x0, x1) + reach) + 1)
+        top = max(0, int(min(y0, y1) - reach))
+        bottom = min(height, int(max(y0, y1) + reach) + 1)
         
-        # Kill the laser after lifetime
-        if time_alive > laser_lifetime:
-            self.alive = False
+        dx = x1 - x0
+        dy = y1 - y0
+        length_sq = dx * dx + dy * dy
+        # Horizontal extent of the beam's glow band on each row
+        length = np.sqrt(length_sq)
+        steep = abs(dy) > 1e-3
+        for py in prange(top, bottom):
+            row_left = left
+            row_right = right
+            if steep:
+                center_x = x0 + (py - y0) * dx / dy
+                half_span = reach * length / abs(dy)
+                row_left = max(left, int(center_x - half_span))
+                row_right = min(right, int(center_x + half_span) + 1)
             
-    def draw(self, frame):
-        """Draw the laser beam on the frame."""
-        end_x = int(self.start_x + self.length * math.cos(self.angle))
-        end_y = int(self.start_y + self.length * math.sin(self.angle))
-        
-        # Create fading effect based on lifetime
-        current_time = time.time()
-        time_alive = current_time - self.create_time
-        fade_factor = max(0, 1.0 - (time_alive / laser_lifetime))
-        
-        # Draw the main laser beam
-        cv2.line(frame, (self.start_x, self.start_y), (end_x, end_y), self.color, self.thickness)
-        
-        # Add glow effect
-        for i in range(1, 4):
-            alpha = fade_factor * (0.7 - i * 0.2)
-            if alpha > 0:
-                cv2.line(frame, (self.start_x, self.start_y), (end_x, end_y), self.color, self.thickness + i*2, cv2.LINE_AA)
-        
-        # Add a bright core
-        cv2.line(frame, (self.start_x, self.start_y), (end_x, end_y), (255, 255, 255), 1, cv2.LINE_AA)
-        
-        return frame
+            for px in range(row_left, row_right):
+                # Distance from the pixel to the closest point on the beam
+                t = 0.0
+                if length_sq > 0:
+                    t = min(1.0, max(0.0, ((px - x0) * dx + (py - y0) * dy) / length_sq))
+                ex = x0 + t * dx - px
+                ey = y0 + t * dy - py
+                distance = np.sqrt(ex * ex + ey * ey)
+                
+                if distance <= half_width:
+                    alpha = 1.0
+                elif distance < reach:
+                    offset = distance - half_width
+                    alpha = glow_strengths[i] * np.exp(offset * offset * glow_scale)
+                else:
+                    continue
+                    
+                for c in range(3):
+                    frame[py, px, c] = np.uint8(frame[py, px, c] * (1.0 - alpha) + colors[i, c] * alpha + 0.5)
+
+def init_effect(width, height):
+    """Compile the laser kernel ahead of time so the first beat doesn't stall.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    _rasterize_lasers(np.zeros((2, 2, 3), dtype=np.uint8), np.zeros((1, 4), dtype=np.float32),
+                      np.zeros((1, 3), dtype=np.float32), np.ones(1, dtype=np.float32),
+                      np.ones(1, dtype=np.float32))
+
+def _spawn_laser(start_x, start_y, angle, color, create_time, thickness=2, speed=30):
+    """Start a new laser beam, replacing the oldest one if all slots are in use.
+    
+    Args:
+        start_x (int): Beam origin x
+        start_y (int): Beam origin y
+        angle (float): Beam direction in radians
+        color (tuple): BGR beam color
+        create_time (float): time.time() timestamp the beam starts at
+        thickness (int): Beam thickness in pixels
+        speed (float): Growth per frame in pixels
+    """
+    free = np.flatnonzero(~_active)
+    slot = free[0] if len(free) else int(np.argmin(_create_time))
+    
+    _start_xy[slot] = (start_x, start_y)
+    _angle[slot] = angle
+    _length[slot] = 20  # Initial length
+    _max_length[slot] = random.randint(100, 500)
+    _speed[slot] = speed
+    _create_time[slot] = create_time
+    _color[slot] = color
+    _thickness[slot] = thickness
+    _active[slot] = True
 
 def process_frame(frame, audio_info):
     """Apply laser beams effect to the frame.
@@ -90,12 +154,12 @@ def process_frame(frame, audio_info):
     Returns:
         numpy.ndarray: Processed frame with laser beams
     """
-    global lasers, last_beat_time, last_laser_time
+    global last_beat_time, last_laser_time
     
     current_time = time.time()
     
     # Segment humans in the frame
-    mask, segmented = segmentation.segment_human(frame)
+    mask = segmentation_cache.get_mask(frame)
     
     # Generate new lasers on beat or based on volume
     should_create_laser = False
@@ -110,9 +174,8 @@ def process_frame(frame, audio_info):
     if should_create_laser and current_time - last_laser_time > min_laser_interval:
         last_laser_time = current_time
         
-        # Find the contours of humans
-        mask_uint8 = (mask[:,:,0] * 255).astype(np.uint8)
-        contours, _ = cv2.findContours(mask_uint8, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Find the contours of humans (findContours treats any nonzero pixel as foreground)
+        contours, _ = cv2.findContours(mask.view(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
         # Get the largest contour (main human)
         if contours:
@@ -142,21 +205,36 @@ def process_frame(frame, audio_info):
                 # Create laser with thickness based on audio volume
                 thickness = int(2 + audio_info["volume"] * 4)
                 
-                # Create and add the laser
-                laser = Laser(start_x, start_y, angle, color, thickness=thickness)
-                lasers.append(laser)
-                
-                # Limit the number of active lasers
-                if len(lasers) > max_lasers:
-                    lasers.pop(0)
+                # Create the laser; the oldest one makes room once max_lasers are active
+                _spawn_laser(start_x, start_y, angle, color, current_time, thickness=thickness)
     
     # Update and draw existing lasers
-    result = frame.copy()
-    for laser in lasers[:]:
-        laser.update()
-        if laser.alive:
-            result = laser.draw(result)
-        else:
-            lasers.remove(laser)
+    result = get_scratch("laser_beams.result", frame.shape)
+    np.copyto(result, frame)
+    
+    # Grow the lasers up to their max length and kill them after their lifetime
+    _length[:] = np.minimum(_length + _speed, _max_length)
+    time_alive = current_time - _create_time
+    _active[time_alive > laser_lifetime] = False
+    
+    active = np.flatnonzero(_active)
+    if len(active):
+        starts = _start_xy[active]
+        angles = _angle[active]
+        lengths = _length[active]
+        ends = starts + lengths[:, None] * np.stack((np.cos(angles), np.sin(angles)), axis=1)
+        segments = np.hstack((starts, ends))
+        half_widths = (_thickness[active] / 2.0 + 1.0).astype(np.float32)
+        
+        # Glow fades out over the laser's lifetime
+        fade = np.maximum(0, 1.0 - time_alive[active] / laser_lifetime)
+        glow_strengths = (fade * 0.7).astype(np.float32)
+        
+        # Draw every beam and its glow in one kernel call
+        _rasterize_lasers(result, segments, _color[active], half_widths, glow_strengths)
+        
+        # Add a bright core
+        for x0, y0, x1, y1 in segments.astype(np.int32).tolist():
+            cv2.line(result, (x0, y0), (x1, y1), (255, 255, 255), 1, cv2.LINE_AA)
     
     return result
\ No newline at end of file
@@ -7,6 +7,12 @@ import numpy as np
 import time
 import math
 
+from videojockey.core.buffers import get_scratch
+from videojockey.core.opencl import opencl_enabled
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
+
 # Effect parameters
 time_start = time.time()
 wave_frequency = 20.0
@@ -15,6 +21,33 @@ flow_speed = 2.0
 horizontal_flow = True
 vertical_flow = True
 
+# Float32 coordinate grid cached across frames
+_coords = None
+
+def init_effect(width, height):
+    """Precompute coordinate tables for the configured frame size.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    _get_coords(height, width)
+
+def _get_coords(height, width):
+    """Get the (y, x) coordinate grid for a frame size, rebuilding it only on resize.
+    
+    Args:
+        height (int): Grid height
+        width (int): Grid width
+        
+    Returns:
+        numpy.ndarray: float32 array of shape (2, height, width) with row and column indices
+    """
+    global _coords
+    if _coords is None or _coords.shape[1:] != (height, width):
+        _coords = np.mgrid[0:height, 0:width].astype(np.float32)
+    return _coords
+
 def process_frame(frame, audio_info):
     """Apply liquid distortion effect to the frame.
     
@@ -48,35 +81,46 @@ def process_frame(frame, audio_info):
     # Adjust frequency based on audio energy in mid-range frequencies
     if len(audio_info["frequency_bands"]) > 3:
         mid_freq = audio_info["frequency_bands"][3]
-        wave_frequency = 10.0 + mid_freq * 30.0
+        wave_frequency = float(10.0 + mid_freq * 30.0)
     
-    # Create output frame
     height, width = frame.shape[:2]
-    output = np.zeros_like(frame)
     
-    # Create meshgrid for vectorized operations
-    y_coords, x_coords = np.mgrid[0:height, 0:width]
+    # Cached meshgrid for vectorized operations
+    y_coords, x_coords = _get_coords(height, width)
     
     # Apply liquid distortion
-    current_wave_amp = wave_amplitude * (1.0 + audio_info["volume"])
+    current_wave_amp = float(wave_amplitude * (1.0 + audio_info["volume"]))
     
     # Time factor for flow
     time_factor = elapsed * flow_speed
     
-    # Apply sinusoidal distortion
+    # Build float32 source coordinates for a backward warp: each output pixel
+    # samples the frame at its displaced position, so there are no holes to fill.
+    # All scalars are plain Python floats so the maps stay float32 for cv2.remap.
+    map_x = x_coords
+    map_y = y_coords
+    
+    # Apply sinusoidal distortion. Each wave only varies along one axis, so the
+    # sines are evaluated once per row or column and broadcast over the frame.
     if horizontal_flow:
         # Horizontal flowing waves
         x_offset = current_wave_amp * np.sin(
-            (y_coords / height * wave_frequency) + time_factor
-        )
-        x_coords = x_coords + x_offset.astype(np.int32)
+            (np.arange(height, dtype=np.float32) / height * wave_frequency) + time_factor
+        ).astype(np.float32)
+        map_x = map_x - x_offset[:, None]
     
     if vertical_flow:
-        # Vertical flowing waves
-        y_offset = current_wave_amp * np.sin(
-            (x_coords / width * wave_frequency) + time_factor
-        )
-        y_coords = y_coords + y_offset.astype(np.int32)
+        # Vertical flowing waves, following the horizontally displaced columns:
+        # sin(a - b) = sin(a)cos(b) - cos(a)sin(b) with a per column and b per row
+        column_phase = np.arange(width, dtype=np.float32) / width * wave_frequency + time_factor
+        sin_a = (current_wave_amp * np.sin(column_phase)).astype(np.float32)
+        cos_a = (current_wave_amp * np.cos(column_phase)).astype(np.float32)
+        if horizontal_flow:
+            row_phase = x_offset / width * wave_frequency
+            y_offset = sin_a * np.cos(row_phase)[:, None] - cos_a * np.sin(row_phase)[:, None]
+        else:
+            y_offset = sin_a[None, :]
+        map_y = map_y - y_offset
     
     # Add circular ripples from center on beat
     if audio_info["beat"]:
@@ -84,30 +128,22 @@ def process_frame(frame, audio_info):
         center_y = height // 2
         
         # Distance from center
-        dx = x_coords - center_x
-        dy = y_coords - center_y
+        dx = map_x - center_x
+        dy = map_y - center_y
         distance = np.sqrt(dx**2 + dy**2)
         
-        # Ripple effect
+        # Ripple effect, scaled by 1 / distance so that multiplying by dx and dy
+        # pushes it outward along cos/sin of the angle from the center
         ripple_offset = current_wave_amp * 0.5 * np.sin(distance * 0.1 - time_factor * 2)
+        ripple_offset /= np.maximum(distance, 1e-6)
         
         # Apply ripple outward from center
-        angle = np.arctan2(dy, dx)
-        x_coords = x_coords + (ripple_offset * np.cos(angle)).astype(np.int32)
-        y_coords = y_coords + (ripple_offset * np.sin(angle)).astype(np.int32)
-    
-    # Ensure coordinates are within bounds
-    x_coords = np.clip(x_coords, 0, width - 1)
-    y_coords = np.clip(y_coords, 0, height - 1)
-    
-    # Map pixels to their new positions
-    output[y_coords, x_coords] = frame[y_coords, x_coords]
-    
-    # If there are holes (black pixels), fill them using a simple interpolation
-    mask = np.all(output == 0, axis=2)
-    if np.any(mask):
-        # Create a blurred version of the result to fill holes
-        blurred = cv2.GaussianBlur(output, (5, 5), 0)
-        output[mask] = blurred[mask]
+        map_x = map_x - ripple_offset * dx
+        map_y = map_y - ripple_offset * dy
     
-    return output
\ No newline at end of file
+    # Sample the frame at the displaced positions
+    if opencl_enabled():
+        return cv2.remap(cv2.UMat(frame), cv2.UMat(map_x), cv2.UMat(map_y), cv2.INTER_LINEAR,
+                         borderMode=cv2.BORDER_REFLECT).get()
+    return cv2.remap(frame, map_x, map_y, cv2.INTER_LINEAR, dst=get_scratch("liquid.output", frame.shape),
+                     borderMode=cv2.BORDER_REFLECT)
@@ -3,9 +3,13 @@ Mirror split effect that creates symmetric reflections.
 """
 
 import cv2
-import numpy as np
 import time
 
+from videojockey.core.buffers import get_scratch
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
+
 # Effect parameters
 split_position = 0.5  # Position of the split (0.0 to 1.0)
 mirror_mode = 0  # 0: left to right, 1: right to left, 2: top to bottom, 3: bottom to top
@@ -42,74 +46,57 @@ def process_frame(frame, audio_info):
         split_change_speed = -split_change_speed
         split_position = max(0.1, min(0.9, split_position))
     
-    # Create output frame
-    output = np.zeros_like(frame)
+    # Build the output in a reused buffer
     height, width = frame.shape[:2]
+    output = get_scratch("mirror_split.output", frame.shape)
     
-    # Apply different mirror modes
+    # Apply different mirror modes; each side is written once, straight into the output
     if mirror_mode == 0:  # Left to right
         split_x = int(width * split_position)
-        left_side = frame[:, :split_x]
+        mirrored = min(split_x, width - split_x)
+        output[:, :split_x] = frame[:, :split_x]
         # Mirror the left side to create the right side
-        right_side = cv2.flip(left_side, 1)
-        # Handle size mismatch
-        right_width = width - split_x
-        if right_side.shape[1] > right_width:
-            right_side = right_side[:, :right_width]
-        # Combine the sides
-        output[:, :split_x] = left_side
-        output[:, split_x:split_x+right_side.shape[1]] = right_side
+        cv2.flip(frame[:, split_x - mirrored:split_x], 1, dst=output[:, split_x:split_x + mirrored])
+        output[:, split_x + mirrored:] = 0
         
     elif mirror_mode == 1:  # Right to left
         split_x = int(width * split_position)
-        right_side = frame[:, split_x:]
+        mirrored = min(split_x, width - split_x)
         # Mirror the right side to create the left side
-        left_side = cv2.flip(right_side, 1)
-        # Handle size mismatch
-        if left_side.shape[1] > split_x:
-            left_side = left_side[:, :split_x]
-        # Combine the sides
-        output[:, :left_side.shape[1]] = left_side
-        output[:, split_x:] = right_side
+        cv2.flip(frame[:, width - mirrored:], 1, dst=output[:, :mirrored])
+        output[:, mirrored:split_x] = 0
+        output[:, split_x:] = frame[:, split_x:]
         
     elif mirror_mode == 2:  # Top to bottom
         split_y = int(height * split_position)
-        top_side = frame[:split_y, :]
+        mirrored = min(split_y, height - split_y)
+        output[:split_y] = frame[:split_y]
         # Mirror the top side to create the bottom side
-        bottom_side = cv2.flip(top_side, 0)
-        # Handle size mismatch
-        bottom_height = height - split_y
-        if bottom_side.shape[0] > bottom_height:
-            bottom_side = bottom_side[:bottom_height, :]
-        # Combine the sides
-        output[:split_y, :] = top_side
-        output[split_y:split_y+bottom_side.shape[0], :] = bottom_side
+        cv2.flip(frame[split_y - mirrored:split_y], 0, dst=output[split_y:split_y + mirrored])
+        output[split_y + mirrored:] = 0
         
     else:  # Bottom to top
         split_y = int(height * split_position)
-        bottom_side = frame[split_y:, :]
+        mirrored = min(split_y, height - split_y)
         # Mirror the bottom side to create the top side
-        top_side = cv2.flip(bottom_side, 0)
-        # Handle size mismatch
-        if top_side.shape[0] > split_y:
-            top_side = top_side[:split_y, :]
-        # Combine the sides
-        output[:top_side.shape[0], :] = top_side
-        output[split_y:, :] = bottom_side
+        cv2.flip(frame[height - mirrored:], 0, dst=output[:mirrored])
+        output[mirrored:split_y] = 0
+        output[split_y:] = frame[split_y:]
     
     # Add beat responsiveness - pulse the image slightly on beat
     if audio_info["beat"]:
-        # Create a slightly zoomed version of the output
+        # Zoom in by scaling the centre crop up to full size in one resize
         zoom_factor = 1.05
-        zoomed = cv2.resize(output, None, fx=zoom_factor, fy=zoom_factor)
-        
-        # Crop to original size from center
-        start_x = (zoomed.shape[1] - width) // 2
-        start_y = (zoomed.shape[0] - height) // 2
-        zoomed = zoomed[start_y:start_y+height, start_x:start_x+width]
+        crop_width = int(round(width / zoom_factor))
+        crop_height = int(round(height / zoom_factor))
+        start_x = (width - crop_width) // 2
+        start_y = (height - crop_height) // 2
+        zoomed = get_scratch("mirror_split.zoomed", frame.shape)
+        cv2.resize(output[start_y:start_y + crop_height, start_x:start_x + crop_width], (width, height),
+                   dst=zoomed)
         
         # Blend with original based on beat intensity
         beat_strength = min(1.0, audio_info["volume"] * 2)
-        output = cv2.addWeighted(output, 1.0 - beat_strength * 0.5, zoomed, beat_strength * 0.5, 0)
+        cv2.addWeighted(output, 1.0 - beat_strength * 0.5, zoomed, beat_strength * 0.5, 0, dst=output)
     
-    return output
\ No newline at end of file
+    return output
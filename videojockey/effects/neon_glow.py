@@ -3,15 +3,51 @@ Neon glow effect that adds a colorful glow to the edges.
 """
 
 import cv2
+import math
 import numpy as np
 import time
 
+from videojockey.core.buffers import get_scratch
+from videojockey.core.colors import hue_value_to_bgr
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
+
 # Effect parameters
 glow_amount = 10
 glow_color = [0, 255, 255]  # Initial color (cyan)
 color_phase = 0
 last_beat_time = 0
 
+# Spread of the glow falloff; matches the sigma of a 21x21 Gaussian blur
+_GLOW_SIGMA = 0.3 * ((21 - 1) * 0.5 - 1) + 0.8
+
+# Weight of the glow when it is added to the frame
+_GLOW_STRENGTH = 0.8
+
+# Glow strength by distance from the nearest edge, cached per glow radius
+_falloff = None
+_falloff_radius = None
+
+def _get_falloff(radius):
+    """Get the glow strength (0-1) for every pixel distance from an edge.
+    
+    This is a step at `radius` smoothed like the dilate + Gaussian blur it replaces.
+    
+    Args:
+        radius (int): Distance up to which the glow is at full strength
+        
+    Returns:
+        numpy.ndarray: float32 array of 256 strengths indexed by distance
+    """
+    global _falloff, _falloff_radius
+    
+    if radius != _falloff_radius:
+        scale = 1.0 / (math.sqrt(2.0) * _GLOW_SIGMA)
+        _falloff = np.array([0.5 * math.erfc((d - radius) * scale) for d in range(256)], dtype=np.float32)
+        _falloff_radius = radius
+    return _falloff
+
 def process_frame(frame, audio_info):
     """Apply neon glow effect to the frame.
     
@@ -50,33 +86,33 @@ def process_frame(frame, audio_info):
     
     # Create shifting hue based on color phase
     hue = int((color_phase * 180 + high_freq * 20) % 180)
-    sat = 255
     val = min(255, 180 + int(audio_info["volume"] * 75))
     
-    # Convert HSV to BGR
-    color_hsv = np.uint8([[[hue, sat, val]]])
-    glow_color = cv2.cvtColor(color_hsv, cv2.COLOR_HSV2BGR)[0][0].tolist()
+    # Look up the fully saturated BGR color
+    glow_color = hue_value_to_bgr(hue, val)
     
     # Process the frame to create glow effect
     
-    # Convert to grayscale
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    # Convert to grayscale at half resolution; the glow is soft anyway
+    height, width = frame.shape[:2]
+    gray = cv2.pyrDown(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
     
     # Apply edge detection
     edges = cv2.Canny(gray, 50, 150)
     
-    # Dilate edges to create glow area
-    kernel = np.ones((current_glow, current_glow), np.uint8)
-    dilated_edges = cv2.dilate(edges, kernel, iterations=1)
-    
-    # Create colored glow mask
-    glow_mask = np.zeros_like(frame)
-    glow_mask[dilated_edges > 0] = glow_color
+    # Distance of every pixel from the nearest edge in full resolution pixels, capped at 255
+    distance = cv2.distanceTransform(cv2.bitwise_not(edges), cv2.DIST_L2, 3)
+    distance = cv2.convertScaleAbs(distance, alpha=width / gray.shape[1])
+    distance = cv2.resize(distance, (width, height), interpolation=cv2.INTER_LINEAR)
     
-    # Blur the glow mask
-    glow_mask = cv2.GaussianBlur(glow_mask, (21, 21), 0)
+    # Create the colored glow in one lookup: each channel maps distance to color * falloff,
+    # which stands in for dilating the edges and blurring the colored result. The
+    # blend strength is folded into the table too.
+    falloff = _get_falloff(max(1, current_glow // 2))
+    color_lut = (falloff[:, None] * (np.array(glow_color, dtype=np.float32) * _GLOW_STRENGTH) + 0.5).astype(np.uint8)
+    glow_mask = cv2.LUT(cv2.cvtColor(distance, cv2.COLOR_GRAY2BGR), color_lut.reshape(256, 1, 3))
     
-    # Blend with original image
-    output = cv2.addWeighted(frame, 1.0, glow_mask, 0.8, 0)
+    # Add the glow to the original image with a saturating uint8 add
+    output = cv2.add(frame, glow_mask, dst=get_scratch("neon_glow.output", frame.shape))
     
     return output
\ No newline at end of file
@@ -5,6 +5,12 @@ Pixel sorting effect that sorts pixels in rows or columns for a glitchy look.
 import cv2
 import numpy as np
 import time
+from numba import njit, prange
+
+from videojockey.core.buffers import get_scratch
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
 sort_vertical = False
@@ -13,6 +19,66 @@ last_beat_time = 0
 beat_interval = 0.5  # seconds
 sort_intensity = 0.7
 
+# Pixels are sorted in runs of this many along the sort direction
+_SEGMENT_LENGTH = 10
+
+@njit(parallel=True, nogil=True, cache=True)
+def _sort_segments(image, threshold):
+    """Sort each bright run of pixels along the rows of an image by luminance, in place.
+    
+    Rows are cut into segments of _SEGMENT_LENGTH pixels; a segment is sorted with an
+    insertion sort (darkest first) if its mean luminance exceeds the threshold.
+    Pass a transposed view to sort columns instead.
+    
+    Args:
+        image (numpy.ndarray): (rows, cols, 3) BGR image, sorted in place
+        threshold (int): Mean luminance a segment must exceed to be sorted
+    """
+    rows, cols = image.shape[:2]
+    for y in prange(rows):
+        luminance = np.empty(_SEGMENT_LENGTH)
+        for x0 in range(0, cols - 1, _SEGMENT_LENGTH):
+            count = min(_SEGMENT_LENGTH, cols - x0)
+            
+            # Calculate luminance
+            total = 0.0
+            for i in range(count):
+                luminance[i] = 0.299 * image[y, x0 + i, 2] + 0.587 * image[y, x0 + i, 1] + 0.114 * image[y, x0 + i, 0]
+                total += luminance[i]
+            
+            # Only sort if average luminance exceeds threshold
+            if total / count <= threshold:
+                continue
+            
+            # Insertion sort, moving each pixel's BGR triple along with its key
+            for i in range(1, count):
+                key = luminance[i]
+                b = image[y, x0 + i, 0]
+                g = image[y, x0 + i, 1]
+                r = image[y, x0 + i, 2]
+                j = i - 1
+                while j >= 0 and luminance[j] > key:
+                    luminance[j + 1] = luminance[j]
+                    image[y, x0 + j + 1, 0] = image[y, x0 + j, 0]
+                    image[y, x0 + j + 1, 1] = image[y, x0 + j, 1]
+                    image[y, x0 + j + 1, 2] = image[y, x0 + j, 2]
+                    j -= 1
+                luminance[j + 1] = key
+                image[y, x0 + j + 1, 0] = b
+                image[y, x0 + j + 1, 1] = g
+                image[y, x0 + j + 1, 2] = r
+
+def init_effect(width, height):
+    """Compile the sorting kernel for rows and columns ahead of time.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    image = np.zeros((2, 2, 3), dtype=np.uint8)
+    _sort_segments(image, 0)
+    _sort_segments(image.transpose(1, 0, 2), 0)
+
 def process_frame(frame, audio_info):
     """Apply pixel sorting effect to the frame.
     
@@ -35,47 +101,21 @@ def process_frame(frame, audio_info):
     # Adjust threshold based on volume
     current_threshold = int(sort_threshold * (1.0 + audio_info["volume"] * 2))
     
-    # Create a copy of the frame
-    result = frame.copy()
+    # Create a copy of the frame in a reused buffer
+    result = get_scratch("pixel_sorting.result", frame.shape)
+    np.copyto(result, frame)
     
-    # Apply pixel sorting
+    # Apply pixel sorting, in columns through a transposed view or in rows
     if sort_vertical:
-        # Sort pixels in columns
-        for x in range(0, frame.shape[1]):
-            for y in range(0, frame.shape[0] - 1, 10):  # Process in chunks for efficiency
-                # Get column segment
-                chunk_size = min(10, frame.shape[0] - y)
-                col = result[y:y+chunk_size, x].reshape(chunk_size, 3)
-                
-                # Calculate luminance
-                luminance = 0.299 * col[:, 2] + 0.587 * col[:, 1] + 0.114 * col[:, 0]
-                
-                # Only sort if average luminance exceeds threshold
-                if np.mean(luminance) > current_threshold:
-                    # Sort pixels by luminance
-                    indices = np.argsort(luminance)
-                    result[y:y+chunk_size, x] = col[indices]
+        _sort_segments(result.transpose(1, 0, 2), current_threshold)
     else:
-        # Sort pixels in rows
-        for y in range(0, frame.shape[0]):
-            for x in range(0, frame.shape[1] - 1, 10):  # Process in chunks for efficiency
-                # Get row segment
-                chunk_size = min(10, frame.shape[1] - x)
-                row = result[y, x:x+chunk_size].reshape(chunk_size, 3)
-                
-                # Calculate luminance
-                luminance = 0.299 * row[:, 2] + 0.587 * row[:, 1] + 0.114 * row[:, 0]
-                
-                # Only sort if average luminance exceeds threshold
-                if np.mean(luminance) > current_threshold:
-                    # Sort pixels by luminance
-                    indices = np.argsort(luminance)
-                    result[y, x:x+chunk_size] = row[indices]
+        _sort_segments(result, current_threshold)
     
     # Adjust intensity based on volume
     current_intensity = min(1.0, sort_intensity + audio_info["volume"] * 0.3)
     
     # Blend with original
-    output = cv2.addWeighted(frame, 1.0 - current_intensity, result, current_intensity, 0)
+    output = cv2.addWeighted(frame, 1.0 - current_intensity, result, current_intensity, 0,
+                             dst=get_scratch("pixel_sorting.output", frame.shape))
     
     return output
\ No newline at end of file
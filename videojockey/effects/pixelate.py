@@ -5,6 +5,13 @@ Pixelate effect that reduces image resolution in a dynamic pattern.
 import cv2
 import numpy as np
 import time
+from numba import njit, prange
+
+from videojockey.core.buffers import get_scratch
+from videojockey.core.opencl import opencl_enabled
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
 min_block_size = 5
@@ -13,6 +20,114 @@ current_block_size = 15
 block_size_change_speed = 0.5
 pixelate_pattern = "uniform"  # uniform, radial, or horizontal
 
+# One generator for all of the effect's randomness
+_rng = np.random.default_rng()
+
+# Number of bands in the horizontal pattern
+_NUM_BANDS = 8
+
+# Band layout of the horizontal pattern, rebuilt when the frame or block size changes
+_band_plan = None
+_band_plan_key = None
+
+@njit(parallel=True, nogil=True, cache=True)
+def _radial_fill(sums, result, block_size, min_size, center_x, center_y, max_distance):
+    """Fill blocks laid out on a block_size grid with their average color, in place.
+    
+    Each block grows with its distance from the center, so blocks can overlap;
+    where they do, the block that comes later in row-major order wins, and
+    pixels no block covers are left untouched. Averages are read from an
+    integral image, so each one costs four lookups whatever the block size.
+    
+    Args:
+        sums (numpy.ndarray): (height + 1, width + 1, 3) integral image of the frame
+        result (numpy.ndarray): (height, width, 3) image holding the frame, filled in place
+        block_size (int): Grid spacing of the blocks
+        min_size (int): Size of a block at the center
+        center_x (int): Center x coordinate
+        center_y (int): Center y coordinate
+        max_distance (float): Distance from the center to a corner
+    """
+    height, width = result.shape[:2]
+    rows = (height + block_size - 1) // block_size
+    cols = (width + block_size - 1) // block_size
+    
+    # Average color and extent of every block
+    colors = np.empty((rows, cols, 3), dtype=np.uint8)
+    x_ends = np.empty((rows, cols), dtype=np.int64)
+    y_ends = np.empty((rows, cols), dtype=np.int64)
+    for row in prange(rows):
+        y = row * block_size
+        for col in range(cols):
+            x = col * block_size
+            dx = x + block_size // 2 - center_x
+            dy = y + block_size // 2 - center_y
+            distance_factor = np.sqrt(dx * dx + dy * dy) / max_distance
+            local_size = max(1, int(min_size + distance_factor * (block_size * 2 - min_size)))
+            x_end = min(x + local_size, width)
+            y_end = min(y + local_size, height)
+            x_ends[row, col] = x_end
+            y_ends[row, col] = y_end
+            
+            area = (x_end - x) * (y_end - y)
+            for c in range(3):
+                total = sums[y_end, x_end, c] - sums[y, x_end, c] - sums[y_end, x, c] + sums[y, x, c]
+                colors[row, col, c] = total // area
+    
+    # Paint each image row with the blocks crossing it, in row-major block order
+    reach = max(min_size, block_size * 2, 1)
+    for y in prange(height):
+        for row in range(max(0, (y - reach) // block_size), min(rows, y // block_size + 1)):
+            for col in range(cols):
+                if y >= y_ends[row, col]:
+                    continue
+                for x in range(col * block_size, x_ends[row, col]):
+                    result[y, x, 0] = colors[row, col, 0]
+                    result[y, x, 1] = colors[row, col, 1]
+                    result[y, x, 2] = colors[row, col, 2]
+
+def _get_band_plan(height, width, block_size):
+    """Get the rows and downscaled size of every band in the horizontal pattern.
+    
+    Bands alternate between block_size and half of it, and the rows below the
+    last band are left out.
+    
+    Args:
+        height (int): Frame height
+        width (int): Frame width
+        block_size (int): Block size of the even bands
+        
+    Returns:
+        list: (y_start, y_end, (small_width, small_height)) tuple for each band
+    """
+    global _band_plan, _band_plan_key
+    key = (height, width, block_size)
+    if _band_plan_key != key:
+        band_height = height // _NUM_BANDS
+        _band_plan = []
+        for i in range(_NUM_BANDS):
+            y_start = i * band_height
+            y_end = min((i + 1) * band_height, height)
+            
+            # Alternate between small and large blocks
+            band_block_size = block_size if i % 2 == 0 else block_size // 2
+            band_block_size = max(1, band_block_size)
+            
+            small_size = (width // band_block_size, (y_end - y_start) // band_block_size)
+            _band_plan.append((y_start, y_end, small_size))
+        _band_plan_key = key
+    return _band_plan
+
+def init_effect(width, height):
+    """Compile the radial pixelation kernel ahead of time.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    image = np.zeros((2, 2, 3), dtype=np.uint8)
+    _radial_fill(cv2.integral(image), image, 1, 1, 1, 1, 1.0)
+
 def process_frame(frame, audio_info):
     """Apply pixelate effect to the frame.
     
@@ -32,9 +147,9 @@ def process_frame(frame, audio_info):
         current_block_size = current_block_size * 0.7 + target_block_size * 0.3
         
         # Occasionally change pixelation pattern on strong beats
-        if audio_info["volume"] > 0.7 and np.random.random() < 0.3:
+        if audio_info["volume"] > 0.7 and _rng.random() < 0.3:
             patterns = ["uniform", "radial", "horizontal"]
-            pixelate_pattern = np.random.choice(patterns)
+            pixelate_pattern = patterns[_rng.integers(len(patterns))]
     else:
         # Gradually decrease pixelation when no beat
         current_block_size = max(
@@ -45,20 +160,30 @@ def process_frame(frame, audio_info):
     # Ensure block size is at least 1 and an integer
     block_size = max(1, int(current_block_size))
     
-    # Create output frame
     height, width = frame.shape[:2]
-    result = frame.copy()
+    
+    if pixelate_pattern == "uniform" and opencl_enabled():
+        # Both resizes run on OpenCL, with the small frame kept in device memory
+        small = cv2.resize(cv2.UMat(frame), (width // block_size, height // block_size),
+                           interpolation=cv2.INTER_LINEAR)
+        return cv2.resize(small, (width, height), interpolation=cv2.INTER_NEAREST).get()
+    
+    # Create output frame
+    result = get_scratch("pixelate.result", frame.shape)
     
     if pixelate_pattern == "uniform":
         # Uniform pixelation - reduce resolution and resize back
+        small_size = (width // block_size, height // block_size)
         small = cv2.resize(
             frame, 
-            (width // block_size, height // block_size),
+            small_size,
+            dst=get_scratch("pixelate.small", (small_size[1], small_size[0], 3)),
             interpolation=cv2.INTER_LINEAR
         )
-        result = cv2.resize(
+        cv2.resize(
             small, 
             (width, height),
+            dst=result,
             interpolation=cv2.INTER_NEAREST  # Use nearest neighbor for pixelated look
         )
         
@@ -68,57 +193,36 @@ def process_frame(frame, audio_info):
         center_y = height // 2
         max_distance = np.sqrt(center_x**2 + center_y**2)
         
-        # Process the image in blocks
-        for y in range(0, height, block_size):
-            for x in range(0, width, block_size):
-                # Calculate distance from center
-                dx = x + block_size // 2 - center_x
-                dy = y + block_size // 2 - center_y
-                distance = np.sqrt(dx**2 + dy**2)
-                
-                # Calculate block size based on distance
-                distance_factor = distance / max_distance
-                local_block_size = int(
-                    min_block_size + distance_factor * (block_size * 2 - min_block_size)
-                )
-                local_block_size = max(1, local_block_size)
-                
-                # Define block region
-                x_end = min(x + local_block_size, width)
-                y_end = min(y + local_block_size, height)
-                
-                # Average color in the block
-                block = frame[y:y_end, x:x_end]
-                avg_color = np.mean(block, axis=(0, 1)).astype(np.uint8)
-                
-                # Fill the block with the average color
-                result[y:y_end, x:x_end] = avg_color
+        # Pixels outside every block keep their original color
+        np.copyto(result, frame)
+        
+        # Fill the blocks with their average colors, summed from an integral image
+        _radial_fill(cv2.integral(frame), result, block_size, min_block_size,
+                     center_x, center_y, float(max_distance))
                 
     elif pixelate_pattern == "horizontal":
         # Horizontal bands with different pixelation levels
-        num_bands = 8
-        band_height = height // num_bands
+        band_plan = _get_band_plan(height, width, block_size)
         
-        for i in range(num_bands):
-            y_start = i * band_height
-            y_end = min((i + 1) * band_height, height)
-            
-            # Alternate between small and large blocks
-            band_block_size = block_size if i % 2 == 0 else block_size // 2
-            band_block_size = max(1, band_block_size)
-            
+        # Rows below the last band are left as they are
+        bands_end = band_plan[-1][1]
+        result[bands_end:] = frame[bands_end:]
+        
+        for y_start, y_end, small_size in band_plan:
             # Pixelate this band
             band = frame[y_start:y_end, :]
             
-            # Reduce resolution and resize back
+            # Reduce resolution and resize back straight into the output rows
             small_band = cv2.resize(
                 band, 
-                (width // band_block_size, (y_end - y_start) // band_block_size),
+                small_size,
+                dst=get_scratch("pixelate.small", (small_size[1], small_size[0], 3)),
                 interpolation=cv2.INTER_LINEAR
             )
-            result[y_start:y_end, :] = cv2.resize(
+            cv2.resize(
                 small_band, 
                 (width, y_end - y_start),
+                dst=result[y_start:y_end, :],
                 interpolation=cv2.INTER_NEAREST
             )
     
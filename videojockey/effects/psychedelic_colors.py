@@ -6,6 +6,13 @@ import cv2
 import numpy as np
 import time
 import random
+import math
+from numba import njit, prange
+
+from videojockey.core.buffers import get_scratch
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
 
 # Effect parameters
 color_shift = [0, 0, 0]  # BGR color shift
@@ -14,6 +21,103 @@ posterize_levels = 4  # Number of color levels per channel
 hue_rotation = 0.0
 saturation_boost = 1.2
 
+# Generator for the bass noise
+_rng = np.random.default_rng()
+
+# BGR <-> YIQ conversion; hue rotation and saturation act on the I/Q chroma plane
+_BGR_TO_YIQ = np.array([
+    [0.114, 0.587, 0.299],
+    [-0.322, -0.274, 0.596],
+    [0.312, -0.523, 0.211],
+])
+_YIQ_TO_BGR = np.linalg.inv(_BGR_TO_YIQ)
+
+# Posterize lookup table, rebuilt when the number of levels changes
+_posterize_lut = None
+_posterize_step = None
+
+@njit(parallel=True, nogil=True, cache=True)
+def _posterize_shift(src, lut, shift_b, shift_g, shift_r, out):
+    """Posterize a frame and roll its channels apart in a single pass.
+    
+    Each channel is mapped through the posterize table, then blue and red are
+    rolled horizontally and green vertically, wrapping around the edges like np.roll.
+    
+    Args:
+        src (numpy.ndarray): uint8 BGR input frame
+        lut (numpy.ndarray): 256-entry uint8 posterize table
+        shift_b (int): Horizontal roll of the blue channel
+        shift_g (int): Vertical roll of the green channel
+        shift_r (int): Horizontal roll of the red channel
+        out (numpy.ndarray): uint8 BGR output frame, same shape as src
+    """
+    height, width = src.shape[:2]
+    shift_b %= width
+    shift_g %= height
+    shift_r %= width
+    for y in prange(height):
+        green_y = y - shift_g
+        if green_y < 0:
+            green_y += height
+        for x in range(width):
+            blue_x = x - shift_b
+            if blue_x < 0:
+                blue_x += width
+            red_x = x - shift_r
+            if red_x < 0:
+                red_x += width
+            out[y, x, 0] = lut[src[y, blue_x, 0]]
+            out[y, x, 1] = lut[src[green_y, x, 1]]
+            out[y, x, 2] = lut[src[y, red_x, 2]]
+
+def _get_posterize_lut(step):
+    """Get the table that quantizes values down to a multiple of step.
+    
+    Args:
+        step (int): Quantization step (256 // posterize levels)
+        
+    Returns:
+        numpy.ndarray: 256-entry uint8 lookup table
+    """
+    global _posterize_lut, _posterize_step
+    if _posterize_step != step:
+        _posterize_lut = (np.arange(256) // step * step).astype(np.uint8)
+        _posterize_step = step
+    return _posterize_lut
+
+def _get_color_matrix(hue, saturation):
+    """Get the BGR color matrix that rotates hue and scales saturation.
+    
+    The frame is taken to YIQ, its chroma (I/Q) is rotated and scaled, and it is
+    taken back to BGR, so brightness is kept while the colors cycle.
+    
+    Args:
+        hue (float): Hue rotation in OpenCV's 0-180 range (2 degrees per unit)
+        saturation (float): Chroma scale factor
+        
+    Returns:
+        numpy.ndarray: 3x3 float32 matrix for cv2.transform
+    """
+    theta = -math.radians(hue * 2)
+    cos_t = math.cos(theta) * saturation
+    sin_t = math.sin(theta) * saturation
+    chroma = np.array([
+        [1.0, 0.0, 0.0],
+        [0.0, cos_t, -sin_t],
+        [0.0, sin_t, cos_t],
+    ])
+    return (_YIQ_TO_BGR @ chroma @ _BGR_TO_YIQ).astype(np.float32)
+
+def init_effect(width, height):
+    """Compile the posterize kernel ahead of time so the first frame doesn't stall.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    frame = np.zeros((2, 2, 3), dtype=np.uint8)
+    _posterize_shift(frame, _get_posterize_lut(256 // posterize_levels), 1, 1, 1, np.empty_like(frame))
+
 def process_frame(frame, audio_info):
     """Apply psychedelic color effects to the frame.
     
@@ -48,44 +152,27 @@ def process_frame(frame, audio_info):
         # Adjust saturation boost based on volume
         saturation_boost = 1.2 + audio_info["volume"] * 0.5
     
-    # Convert to HSV for easier color manipulation
-    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-    
-    # Rotate hue
-    hsv[:, :, 0] = (hsv[:, :, 0] + hue_rotation) % 180
-    
-    # Boost saturation
-    hsv[:, :, 1] = np.clip(hsv[:, :, 1] * saturation_boost, 0, 255).astype(np.uint8)
+    # Rotate hue and boost saturation with a single color matrix
+    result = cv2.transform(frame, _get_color_matrix(hue_rotation, saturation_boost),
+                           dst=get_scratch("psychedelic_colors.colors", frame.shape))
     
-    # Convert back to BGR
-    result = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-    
-    # Apply posterization (color quantization)
-    # Divide by levels, round, and multiply back to get fewer color levels
+    # Apply posterization (color quantization) and shift each channel in one pass:
+    # blue horizontally, green vertically and red horizontally the opposite way
     levels = 256 // posterize_levels
-    result = ((result // levels) * levels).astype(np.uint8)
-    
-    # Apply color channel shifting
-    b, g, r = cv2.split(result)
-    
-    # Shift each channel
-    b = np.roll(b, int(color_shift[0]) % 100 - 50, axis=1)  # Horizontal shift for blue
-    g = np.roll(g, int(color_shift[1]) % 100 - 50, axis=0)  # Vertical shift for green
-    r = np.roll(r, -int(color_shift[2]) % 50 - 25, axis=1)  # Opposite horizontal shift for red
-    
-    # Merge channels back
-    result = cv2.merge([b, g, r])
+    output = get_scratch("psychedelic_colors.output", frame.shape)
+    _posterize_shift(result, _get_posterize_lut(levels), int(color_shift[0]) % 100 - 50, int(color_shift[1]) % 100 - 50,
+                     -int(color_shift[2]) % 50 - 25, output)
+    result = output
     
     # Add noise based on bass frequency
     if len(audio_info["frequency_bands"]) > 0:
         bass_intensity = audio_info["frequency_bands"][0] * 8
         if bass_intensity > 0.5:
-            try:
-	        noise = np.random.randint(0, int(50 * bass_intensity), result.shape[:2], dtype=np.uint8)
-            except:
-                noise = 50
-            noise_mask = np.random.random(result.shape[:2]) < (bass_intensity * 0.1)
-            noise_mask = noise_mask[:, :, np.newaxis].repeat(3, axis=2)
-            result = np.where(noise_mask, result + noise[:, :, np.newaxis], result)
+            # Brighten a random bass_intensity * 10% of the pixels, drawing values only for those
+            pixels = result.reshape(-1, 3)
+            count = _rng.binomial(len(pixels), min(bass_intensity * 0.1, 1.0))
+            index = _rng.integers(0, len(pixels), count)
+            noise = _rng.integers(0, min(int(50 * bass_intensity), 256), (count, 1), dtype=np.int16)
+            pixels[index] = np.minimum(pixels[index] + noise, 255)
     
     return result
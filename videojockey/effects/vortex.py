@@ -8,6 +8,12 @@ import math
 import time
 import random
 
+from videojockey.core.buffers import get_scratch
+from videojockey.core.opencl import opencl_enabled
+
+# process_frame never writes to its input frame
+MUTATES_FRAME = False
+
 # Effect parameters
 vortex_strength = 10.0
 rotation_speed = 0.5
@@ -16,6 +22,77 @@ center_y_offset = 0
 radius_factor = 0.8
 time_start = time.time()
 
+# Frames bigger than this are swirled at half resolution and scaled back up;
+# the remap gather dominates the effect's cost and the swirl hides the softening
+_MAX_WORK_PIXELS = 1280 * 720
+
+# Polar coordinates of every pixel around the current center, cached across frames
+# (as cv2.UMat when the effect runs on OpenCL)
+_polar = None
+_polar_key = None
+
+# Polar radius clipped to the current maximum radius, cached alongside the polar tables
+_clipped_radius = None
+_clipped_key = None
+
+def init_effect(width, height):
+    """Precompute the polar coordinate tables for the configured frame size.
+    
+    Args:
+        width (int): Frame width
+        height (int): Frame height
+    """
+    if width * height > _MAX_WORK_PIXELS:
+        width //= 2
+        height //= 2
+    _get_polar(height, width, width // 2, height // 2, opencl_enabled())
+
+def _scratch(key, shape, use_umat):
+    """Get a scratch buffer for a cv2 dst argument, or None to let OpenCV allocate a UMat."""
+    return None if use_umat else get_scratch(key, shape)
+
+def _get_polar(height, width, center_x, center_y, use_umat=False):
+    """Get the radius and angle of every pixel around a center, rebuilding them only when it moves.
+    
+    Args:
+        height (int): Frame height
+        width (int): Frame width
+        center_x (int): Vortex center column
+        center_y (int): Vortex center row
+        use_umat (bool): Keep the tables in OpenCL memory as cv2.UMat
+        
+    Returns:
+        tuple: (radius, angle) float32 arrays of shape (height, width)
+    """
+    global _polar, _polar_key
+    key = (height, width, center_x, center_y, use_umat)
+    if _polar_key != key:
+        y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+        dx = x - center_x
+        dy = y - center_y
+        _polar = (np.sqrt(dx**2 + dy**2), np.arctan2(dy, dx))
+        if use_umat:
+            _polar = (cv2.UMat(_polar[0]), cv2.UMat(_polar[1]))
+        _polar_key = key
+    return _polar
+
+def _get_clipped_radius(radius, max_radius):
+    """Get the radius table clipped to max_radius, rebuilding it only when the center or max_radius changes.
+    
+    Args:
+        radius (numpy.ndarray): Radius table returned by _get_polar
+        max_radius (float): Radius at which the swirl fades out
+        
+    Returns:
+        numpy.ndarray: float32 table of min(radius, max_radius)
+    """
+    global _clipped_radius, _clipped_key
+    key = (_polar_key, max_radius)
+    if _clipped_key != key:
+        _clipped_radius = cv2.min(radius, max_radius)
+        _clipped_key = key
+    return _clipped_radius
+
 def process_frame(frame, audio_info):
     """Apply vortex swirl effect to the frame.
     
@@ -52,45 +129,49 @@ def process_frame(frame, audio_info):
         bass = audio_info["frequency_bands"][0]
         radius_factor = 0.5 + bass * 2.0
     
-    # Create output frame
-    height, width = frame.shape[:2]
-    output = np.zeros_like(frame)
+    # With OpenCL every step below runs on the device and only the frame and
+    # result are transferred
+    use_umat = opencl_enabled()
+    source = cv2.UMat(frame) if use_umat else frame
+    
+    # Work on a half-size frame at high resolutions
+    full_height, full_width = frame.shape[:2]
+    height, width = full_height, full_width
+    if width * height > _MAX_WORK_PIXELS:
+        height //= 2
+        width //= 2
+        source = cv2.resize(source, (width, height),
+                            dst=_scratch("vortex.small", (height, width, 3), use_umat),
+                            interpolation=cv2.INTER_AREA)
     
     # Calculate center point with offset
     center_x = width // 2 + int(center_x_offset * width)
     center_y = height // 2 + int(center_y_offset * height)
     
-    # Maximum radius
-    max_radius = min(width, height) * radius_factor // 2
+    # Maximum radius, kept at least 1 so a quiet bass can't divide by zero
+    max_radius = max(float(min(width, height) * radius_factor // 2), 1.0)
     
-    # Create meshgrid for vectorized operations
-    y, x = np.mgrid[0:height, 0:width]
-    
-    # Calculate polar coordinates
-    dx = x - center_x
-    dy = y - center_y
-    radius = np.sqrt(dx**2 + dy**2)
-    angle = np.arctan2(dy, dx)
+    # Cached polar coordinates for the current center
+    radius, angle = _get_polar(height, width, center_x, center_y, use_umat)
     
     # Apply vortex effect
-    # Rotation amount decreases with distance from center
-    rotation_amount = current_rotation + vortex_strength * (1.0 - np.clip(radius / max_radius, 0, 1))
-    
-    # Add time-based rotation
-    rotation_amount += elapsed * rotation_speed
-    
-    # Update angles
-    new_angle = angle + rotation_amount
-    
-    # Convert back to Cartesian coordinates
-    new_x = center_x + radius * np.cos(new_angle)
-    new_y = center_y + radius * np.sin(new_angle)
-    
-    # Clip coordinates to valid image bounds
-    new_x = np.clip(new_x, 0, width-1).astype(np.int32)
-    new_y = np.clip(new_y, 0, height-1).astype(np.int32)
-    
-    # Map pixels to new positions
-    output[y, x] = frame[new_y, new_x]
-    
-    return output
\ No newline at end of file
+    # Rotation amount decreases linearly with distance from center, down to the
+    # base and time-based rotation at max_radius
+    base_rotation = float(current_rotation + vortex_strength + elapsed * rotation_speed)
+    new_angle = cv2.addWeighted(_get_clipped_radius(radius, max_radius), -float(vortex_strength) / max_radius,
+                                angle, 1.0, base_rotation)
+    
+    # Convert back to Cartesian coordinates, giving the source position of each pixel
+    map_x, map_y = cv2.polarToCart(radius, new_angle)
+    map_x = cv2.add(map_x, float(center_x), dst=map_x)
+    map_y = cv2.add(map_y, float(center_y), dst=map_y)
+    
+    # Sample the frame at the swirled positions
+    result = cv2.remap(source, map_x, map_y, cv2.INTER_LINEAR,
+                       dst=_scratch("vortex.result", (height, width, 3), use_umat),
+                       borderMode=cv2.BORDER_REFLECT101)
+    if height != full_height:
+        result = cv2.resize(result, (full_width, full_height),
+                            dst=_scratch("vortex.output", frame.shape, use_umat),
+                            interpolation=cv2.INTER_LINEAR)
+    return result.get() if use_umat else result